@@ -1,25 +1,47 @@
-import os
-from sqlite3 import IntegrityError
-from typing import List
-from fastapi.responses import FileResponse
-from database import get_db
-from fastapi import APIRouter, Body, HTTPException, Depends
+import asyncio
+import json
+import math
+from datetime import date
+from typing import List, Optional
+from fastapi.responses import FileResponse, StreamingResponse
+from database import AsyncSessionLocal, ReadSessionLocal, get_db, get_read_db
+from fastapi import APIRouter, Body, HTTPException, Depends, Query, Request, Response
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 import logging
 import schemas
-from sklearn.linear_model import LinearRegression
 import models
+from data_access import INTERVALS, fetch_frame, latest_closes_query, stock_data_query, stored_predictions_query, upsert_rows
+from export import EXPORT_FORMATS, fetch_export_table, serialize_table
+from ingest import ingest_symbol
+from indicator_store import DEFAULT_INDICATORS, load_indicators
+from alpha_vantage import AlphaVantageError, get_alpha_vantage_client
+from ohlcv_cache import load_ohlcv, ohlcv_cache
+from response_cache import cache_response, cached_response, response_cache, response_etag
+from backtest import (
+    MAX_SWEEP_COMBINATIONS,
+    portfolio_backtest,
+    run_backtrader,
+    sweep_chunk,
+    vector_backtest,
+)
+from executor import ExecutorSaturated, compute
+from instrumentation import span
+from model_registry import inference
+from plots import (
+    cached_plot,
+    plot_key,
+    render_backtest_plot,
+    render_portfolio_plot,
+    render_prediction_plot,
+    render_report_pdf,
+)
+from reports import backtest_report, build_report, recall_report, remember_report, report_key
+from prediction import fit_linear_trend, fit_symbol_trends, model_version, recall_prediction, remember_prediction
 from fastapi import APIRouter
-import requests
-from datetime import datetime, timedelta
-import backtrader as bt
+import httpx
 import pandas as pd
-import numpy as np
-import matplotlib
-import matplotlib.pyplot as plt
-matplotlib.use('Agg')
 
 router=APIRouter(
     prefix="/data",
@@ -28,223 +50,354 @@ router=APIRouter(
 
 
 
+MAX_DISPLAY_LIMIT = 10000
+DISPLAY_COLUMNS = ["symbol", "date", "open_price", "close_price", "high_price", "low_price", "volume"]
+# Cached display bodies bypass response_model, so they are shaped by the same schema up front
+DISPLAY_ROWS = TypeAdapter(List[schemas.CreateStockData])
+STREAM_BATCH_SIZE = 1000
+PREDICTION_WINDOW = 30
+
+
+def _display_values(row):
+    return [
+        row.symbol,
+        row.date.isoformat(),
+        float(row.open_price),
+        float(row.close_price),
+        float(row.high_price),
+        float(row.low_price),
+        row.volume,
+    ]
+
+
+async def _stream_display(query, format):
+    # The request's session may be closed before the body is sent, so the
+    # stream owns its session and reads through a server-side cursor
+    async with ReadSessionLocal() as session:
+        result = await session.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        if format == "csv":
+            yield ",".join(DISPLAY_COLUMNS) + "\n"
+        async for rows in result.partitions():
+            if format == "csv":
+                yield "".join(",".join(map(str, _display_values(row))) + "\n" for row in rows)
+            else:
+                yield "".join(json.dumps(dict(zip(DISPLAY_COLUMNS, _display_values(row)))) + "\n" for row in rows)
+
+
 @router.get('/display/{symbol}', response_model=List[schemas.CreateStockData])
-async def test_posts(symbol:str,db: AsyncSession = Depends(get_db)):
+async def test_posts(
+    symbol: str,
+    request: Request,
+    start: Optional[date] = Query(None, description="First date to include"),
+    end: Optional[date] = Query(None, description="Last date to include"),
+    after: Optional[date] = Query(None, description="Resume after this date (value of X-Next-Cursor)"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_DISPLAY_LIMIT, description="Maximum rows to return"),
+    format: str = Query("json", description="json, ndjson or csv"),
+    interval: str = Query("daily", description="daily, weekly or monthly bars"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if format not in ("json", "ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="Unsupported format")
+    if interval not in INTERVALS:
+        raise HTTPException(status_code=400, detail="Unsupported interval")
+
+    query = stock_data_query(symbol, DISPLAY_COLUMNS, start, end, after, limit, interval)
+    if format != "json":
+        media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+        return StreamingResponse(_stream_display(query, format), media_type=media_type)
+
     try:
-        # Execute the query to fetch stock data with the specified symbol
-        result = await db.execute(
-            select(models.StockData).where(models.StockData.symbol == symbol)
-        )
-        sdata = result.scalars().all()
+        # The frame cache also tells us the latest bar, which every page's ETag depends on
+        frame = await load_ohlcv(db, symbol, interval)
 
-        if not sdata:
+        if frame.empty:
             # If no data is found, return an empty list with a 200 status code
             return []
 
-        print(sdata)  # Debug print, remove in production if not needed
-        return sdata
+        etag = response_etag("display", symbol, frame, interval=interval, start=start, end=end, after=after, limit=limit)
+        cached = cached_response(request, symbol, etag)
+        if cached is not None:
+            return cached
+
+        if start is None and end is None and after is None and limit is None:
+            # Full history: served straight from the cached frame
+            with span("serialize"):
+                sdata = frame.reset_index()
+                sdata['date'] = sdata['date'].dt.date
+                sdata['symbol'] = symbol
+                return cache_response(request, symbol, etag, DISPLAY_ROWS.validate_python(sdata.to_dict("records")))
+
+        with span("db_fetch"):
+            result = await db.execute(query)
+            sdata = result.all()
+
+        # A full page means there may be more; hand back the keyset cursor
+        headers = {}
+        if limit is not None and len(sdata) == limit:
+            headers["X-Next-Cursor"] = sdata[-1].date.isoformat()
+        with span("serialize"):
+            rows = DISPLAY_ROWS.validate_python([dict(row._mapping) for row in sdata])
+            return cache_response(request, symbol, etag, rows, headers)
 
     except SQLAlchemyError as e:
         # Log the specific error and raise a 500 Internal Server Error with a message
-        print(f"Database error occurred: {e}")
+        logger.error(f"Database error occurred: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch data from the database due to an internal error.")
 
     except Exception as e:
         # Catch any unexpected errors
-        print(f"An unexpected error occurred: {e}")
+        logger.error(f"An unexpected error occurred: {e}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred while processing your request.")
 
 @router.post('/populate/{symbol}', response_model=List[schemas.CreateStockData])
-async def populate_stocks(symbol:str,db: AsyncSession = Depends(get_db)):
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
-    url = f'https://www.alphavantage.co/query?function=TIME_SERIES_DAILY&symbol={symbol}&apikey={api_key}&outputsize=full'
-
+async def populate_stocks(symbol:str, incremental: bool = True, db: AsyncSession = Depends(get_db)):
     try:
-        # Fetch the data    
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an error for bad responses
-        data = response.json()
-
-        # Extract the daily time series data
-        daily_data = data.get("Time Series (Daily)", {})
-
-        # Calculate the date two years ago from today
-        two_years_ago = datetime.now() - timedelta(days=2 * 365)
-
-        # Filter data to get only the entries from the past two years
-        filtered_data = {
-            date: values
-            for date, values in daily_data.items()
-            if datetime.strptime(date, "%Y-%m-%d") >= two_years_ago
-        }
-
-        # Prepare data for insertion
-        stock_entries = []
-        for date, values in filtered_data.items():
-            stock_entry = models.StockData(
-                date=datetime.strptime(date, "%Y-%m-%d").date(),
-                symbol=symbol,
-                open_price=float(values["1. open"]),
-                high_price=float(values["2. high"]),
-                low_price=float(values["3. low"]),
-                close_price=float(values["4. close"]),
-                volume=float(values["5. volume"]),
-            )
-            stock_entries.append(stock_entry)
-
-        # Insert data into the database
-        async with db.begin():
-            db.add_all(stock_entries)
+        # Only fetches and upserts the bars we don't have yet
+        return await ingest_symbol(db, get_alpha_vantage_client(), symbol, incremental)
 
-        return stock_entries  # You can modify this return as needed
-
-    except requests.RequestException as e:
+    except ExecutorSaturated:
+        raise
+    except (httpx.HTTPError, AlphaVantageError) as e:
         raise HTTPException(status_code=500, detail=f"Error fetching data from Alpha Vantage: {e}")
     except IntegrityError as e:
         raise HTTPException(status_code=400, detail="Data integrity error: possible duplicate entries.")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {e}")
-    
-    
-    
 
-class MovingAverageCrossStrategy(bt.Strategy):
-    params = (('short_period', 50), ('long_period', 200))
 
-    def __init__(self):
-        self.short_ma = bt.indicators.SimpleMovingAverage(self.data.close, period=self.params.short_period)
-        self.long_ma = bt.indicators.SimpleMovingAverage(self.data.close, period=self.params.long_period)
-        self.predicted_price = []  
+@router.post('/populate', response_model=dict)
+async def populate_stocks_batch(request: schemas.PopulateBatchRequest):
+    client = get_alpha_vantage_client()
+    semaphore = asyncio.Semaphore(request.max_concurrency)
 
-    def next(self):
-        # Add your logic for predicting prices
-        if self.short_ma[0] > self.long_ma[0] or self.short_ma[0] < self.long_ma[0]:
-            # Append current close price to predictions
-            self.predicted_price.append(self.data.close[0])  # Now this works correctly
+    async def populate_one(symbol):
+        # Sessions can't be shared between concurrent tasks, so each symbol gets its own
+        async with semaphore, AsyncSessionLocal() as db:
+            try:
+                rows = await ingest_symbol(db, client, symbol, request.incremental)
+                return {"symbol": symbol, "inserted": len(rows)}
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Populate failed for {symbol}: {e}")
+                return {"symbol": symbol, "inserted": 0, "error": str(e)}
 
+    results = await asyncio.gather(*(populate_one(symbol) for symbol in dict.fromkeys(request.symbols)))
+    return {
+        "results": results,
+        "inserted": sum(result["inserted"] for result in results),
+        "failed": [result["symbol"] for result in results if "error" in result],
+    }
 
 
 @router.post('/backtest', response_model=dict)
 async def backtest_strategy(
+    request: Request,
     symbol: str = Body(..., description="Stock symbol to backtest"),
     short_period: int = Body(..., description="Short moving average period"),
     long_period: int = Body(..., description="Long moving average period"),
     initial_cash: float = Body(..., description="Initial investment amount"),
-    db: AsyncSession = Depends(get_db)
+    engine: str = Body("backtrader", description="Backtest engine: 'backtrader' or 'vector'"),
+    interval: str = Body("daily", description="Bar size: 'daily', 'weekly' or 'monthly'"),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    # Ensure the static directory exists
-    if not os.path.exists("static"):
-        os.makedirs("static")
+    if engine not in ("backtrader", "vector"):
+        raise HTTPException(status_code=400, detail="Unsupported engine")
+    if interval not in INTERVALS:
+        raise HTTPException(status_code=400, detail="Unsupported interval")
 
-    # Fetch stock data from the database
-    stock_data = await db.execute(
-        select(models.StockData).where(models.StockData.symbol == symbol)
-    )
-    sdata = stock_data.scalars().all()
+    # Fetch stock data, already shaped as a date-indexed frame (rollups for weekly/monthly)
+    df = await load_ohlcv(db, symbol, interval)
 
-    if not sdata:
+    if df.empty:
         raise HTTPException(status_code=404, detail="No stock data found.")
 
-    stock_data_dicts = [
-        {
-            "symbol": stock.symbol,
-            "date": stock.date,
-            "open_price": stock.open_price,
-            "close_price": stock.close_price,
-            "high_price": stock.high_price,
-            "low_price": stock.low_price,
-            "volume": stock.volume,
-        }
-        for stock in sdata
-    ]
-
-    df = pd.DataFrame(stock_data_dicts)
-    df['date'] = pd.to_datetime(df['date'])
-    df.set_index('date', inplace=True)
-
-    cerebro = bt.Cerebro()
-    data_feed = bt.feeds.PandasData(
-        dataname=df,
-        open='open_price',
-        high='high_price',
-        low='low_price',
-        close='close_price',
-        volume='volume',
+    # A backtest is a pure function of its parameters and the data, so identical requests can revalidate
+    etag = response_etag(
+        "backtest",
+        symbol,
+        df,
+        short_period=short_period,
+        long_period=long_period,
+        initial_cash=initial_cash,
+        engine=engine,
+        interval=interval,
     )
-    cerebro.adddata(data_feed)
-    cerebro.addstrategy(MovingAverageCrossStrategy, short_period=short_period, long_period=long_period)
-    cerebro.broker.setcash(initial_cash)
-
-    cerebro.run()
-    plot_path = "../static/backtest_plot.png"
-
-    strategy = cerebro.runstrats[0]
-    predicted_price = strategy[0].predicted_price
-    final_value = cerebro.broker.getvalue()
-    total_return = final_value - initial_cash
-
-    short_mavg = df['close_price'].rolling(window=short_period).mean()
-    long_mavg = df['close_price'].rolling(window=long_period).mean()
+    cached = cached_response(request, symbol, etag)
+    if cached is not None:
+        return cached
+
+    # Both the engine run and the chart are CPU-bound; keep them off the event loop
+    if engine == "vector":
+        with span("vector_backtest"):
+            result = await compute.run(vector_backtest, df['close_price'].to_numpy(), short_period, long_period, initial_cash)
+    else:
+        with span("cerebro_run"):
+            result = await compute.run(run_backtrader, df, short_period, long_period, initial_cash)
+
+    predicted_price = result["predicted_price"]
+    final_value = result["final_value"]
+    total_return = result["total_return"]
+
+    # Same symbol, parameters and data always give the same chart
+    key = plot_key(
+        "backtest",
+        symbol=symbol,
+        short_period=short_period,
+        long_period=long_period,
+        initial_cash=initial_cash,
+        engine=engine,
+        interval=interval,
+        last_date=df.index[-1],
+        bars=len(df),
+    )
+    plot_path = cached_plot(key)
+    if plot_path is None:
+        with span("plot_render"):
+            plot_path = await compute.run(
+                render_backtest_plot,
+                key,
+                df.index,
+                df['close_price'].to_numpy(),
+                result["short_ma"],
+                result["long_ma"],
+                predicted_price,
+                final_value,
+            )
 
-    # Use the dates from your DataFrame for historical prices
-    historical_close = df['close_price']  # Ensure you have the close prices
+    # Scoring the curve is a few vectorized passes; keep it so /report can reuse it
+    with span("metrics"):
+        report = build_report(symbol, df, short_period, long_period, initial_cash, engine, interval, result)
+    remember_report(report_key(symbol, short_period, long_period, initial_cash, engine, interval, df), report)
 
-    # Define the date range for predictions
-    predicted_dates = pd.date_range(start=df.index[-1] + pd.Timedelta(days=1), 
-                                    periods=len(predicted_price), freq='B')  # Business days
+    return cache_response(request, symbol, etag, {
+        "final_value": final_value,
+        "total_return": total_return,
+        "predicted_prices": predicted_price,
+        # Relative to the /data/ pages that display it
+        "plot_url": f"../{plot_path}",
+        "engine": engine,
+        "interval": interval,
+        "performance_summary": report["metrics"],
+    }, files=[plot_path])
+
+
+
+@router.post('/backtest/sweep', response_model=dict)
+async def backtest_sweep(request: schemas.BacktestSweepRequest, db: AsyncSession = Depends(get_read_db)):
+    # Bound the grid by its full size before materializing a single combination
+    grid_size = len(request.short_period.values()) * len(request.long_period.values()) * len(request.initial_cash)
+    if grid_size > MAX_SWEEP_COMBINATIONS:
+        raise HTTPException(status_code=400, detail=f"Parameter grid exceeds {MAX_SWEEP_COMBINATIONS} combinations.")
+
+    combos = [
+        (short_period, long_period, initial_cash)
+        for short_period in request.short_period.values()
+        for long_period in request.long_period.values()
+        if 0 < short_period < long_period
+        for initial_cash in request.initial_cash
+        if initial_cash > 0
+    ]
+    if not combos:
+        raise HTTPException(status_code=400, detail="Parameter grid is empty.")
 
-    # Ensure historical close prices are plotted against their own dates
-    plt.figure(figsize=(14, 7))
+    # Load the closes once and share them across the whole grid
+    close = (await load_ohlcv(db, request.symbol))['close_price'].to_numpy()
+    if not len(close):
+        raise HTTPException(status_code=404, detail="No stock data found.")
 
-    # Plot historical close prices
-    plt.plot(df.index, historical_close, label='Historical Close Prices', color='black', linewidth=1.5)
+    # One chunk per compute worker keeps them all busy without pickling the closes per
+    # combination; the whole sweep is admitted (or refused with 503) as one batch
+    chunk_size = max(1, math.ceil(len(combos) / min(compute.workers, compute.max_pending)))
+    with span("sweep"):
+        chunks = await compute.run_all(
+            sweep_chunk,
+            [(close, combos[i:i + chunk_size]) for i in range(0, len(combos), chunk_size)],
+        )
 
-    # Plot short moving average, using the same index as historical data
-    plt.plot(df.index, short_mavg, label='Short Moving Average', color='orange', linestyle='--')
+    rows = sorted((row for chunk in chunks for row in chunk), key=lambda row: row["return_pct"], reverse=True)
+    for rank, row in enumerate(rows, start=1):
+        row["rank"] = rank
 
-    # Plot long moving average, using the same index as historical data
-    plt.plot(df.index, long_mavg, label='Long Moving Average', color='green', linestyle='--')
+    return {
+        "symbol": request.symbol,
+        "bars": len(close),
+        "combinations": len(rows),
+        "results": rows[:request.top] if request.top else rows,
+    }
 
-    # Plot predicted prices against the new predicted_dates
-    plt.plot(predicted_dates, predicted_price, label='Predicted Prices(Strategy usage)', color='blue', linestyle='dotted')
 
-    # Indicate the final portfolio value
-    final_value = cerebro.broker.getvalue()
-    plt.axhline(y=final_value, color='red', linestyle='--', label='Final Portfolio Value')
+@router.post('/backtest/portfolio', response_model=dict)
+async def backtest_portfolio(request: schemas.PortfolioBacktestRequest, db: AsyncSession = Depends(get_read_db)):
+    symbols = [asset.symbol for asset in request.assets]
+    if not symbols or len(set(symbols)) != len(symbols):
+        raise HTTPException(status_code=400, detail="Provide each portfolio symbol exactly once.")
+    if any(asset.weight <= 0 for asset in request.assets):
+        raise HTTPException(status_code=400, detail="Portfolio weights must be positive.")
 
-    # Add titles and labels
-    plt.title('Backtest Results with Strategy Performance')
-    plt.xlabel('Date')
-    plt.ylabel('Price')
-    plt.legend()
-    plt.grid()  
+    # One query for the whole universe instead of one per symbol
+    df = await fetch_frame(db, stock_data_query(symbols, ["date", "symbol", "close_price"]))
+    if df.empty:
+        raise HTTPException(status_code=404, detail="No stock data found.")
 
-    # Save the plot
-    try:
-        plt.savefig(plot_path)
-        print(f"Plot saved to {plot_path}")
-    except Exception as e:
-        print(f"Error saving plot: {e}")
+    with span("frame_build"):
+        df['date'] = pd.to_datetime(df['date'])
+        # Align every symbol on the dates they all have
+        closes = df.pivot_table(index="date", columns="symbol", values="close_price", aggfunc="last")
+        closes = closes.reindex(columns=symbols).astype(float).dropna()
+    if closes.empty:
+        missing = [symbol for symbol in symbols if symbol not in set(df['symbol'])]
+        detail = f"No stock data found for: {', '.join(missing)}" if missing else "Symbols share no common dates."
+        raise HTTPException(status_code=404, detail=detail)
+
+    weights = [asset.weight for asset in request.assets]
+    with span("portfolio_backtest"):
+        portfolio = await compute.run(
+            portfolio_backtest,
+            closes.to_numpy(), weights, request.short_period, request.long_period, request.initial_cash
+        )
 
-    # Close the plot to free up memory
-    plt.close()
-    
-    # try:
-    #     cerebro.plot(show=False, savefig=plot_path)
-    #     print(f"Plot saved to {plot_path}")
-    # except Exception as e:
-    #     print(f"Error saving plot: {e}")
+    key = plot_key(
+        "portfolio",
+        assets=[[asset.symbol, asset.weight] for asset in request.assets],
+        short_period=request.short_period,
+        long_period=request.long_period,
+        initial_cash=request.initial_cash,
+        last_date=closes.index[-1],
+        bars=len(closes),
+    )
+    plot_path = cached_plot(key)
+    if plot_path is None:
+        with span("plot_render"):
+            plot_path = await compute.run(
+                render_portfolio_plot,
+                key,
+                closes.index,
+                symbols,
+                portfolio["equity"],
+                portfolio["total_equity"],
+            )
 
+    dates = closes.index.strftime('%Y-%m-%d').tolist()
     return {
-        "final_value": final_value,
-        "total_return": total_return,
-        "predicted_prices": predicted_price,
-        "plot_url": plot_path,
-        "performance_summary": "Add more detailed metrics if needed."
+        "dates": dates,
+        "symbols": {
+            symbol: {
+                "weight": weights[j],
+                "allocation": float(portfolio["allocations"][j]),
+                "final_value": float(portfolio["equity"][-1, j]),
+                "total_return": float(portfolio["equity"][-1, j] - portfolio["allocations"][j]),
+                "trades": portfolio["trades"][j],
+                "equity": portfolio["equity"][:, j].tolist(),
+            }
+            for j, symbol in enumerate(symbols)
+        },
+        "equity": portfolio["total_equity"].tolist(),
+        "final_value": portfolio["final_value"],
+        "total_return": portfolio["total_return"],
+        "plot_url": f"../{plot_path}",
     }
 
 
-
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
@@ -265,84 +418,172 @@ async def read_backtest():
 async def read_backtest():
     return FileResponse("Views/summary.html")
 
+async def _store_predictions(db, rows):
+    predicted = models.PredictedStockData.__table__
+    with span("db_write"):
+        await upsert_rows(
+            db,
+            predicted,
+            rows,
+            key_columns=["symbol", "model_version", "as_of_date", "date"],
+            update_columns=["actual_price", "predicted_price"],
+        )
+        await db.commit()
+
+
+@router.post('/predict/batch', response_model=dict)
+async def predict_stock_prices_batch(request: schemas.PredictBatchRequest, db: AsyncSession = Depends(get_db)):
+    # The last `window` closes of every requested symbol (or all of them) in one query
+    history = await fetch_frame(db, latest_closes_query(request.symbols, request.window))
+    if history.empty:
+        raise HTTPException(status_code=404, detail="No historical data found for the requested symbols.")
+
+    # One vectorized least-squares solve for every symbol
+    with span("regression_fit"):
+        predictions = await compute.run(fit_symbol_trends, history)
+    version = model_version(request.window)
+    predictions["as_of_date"] = predictions.groupby("symbol", sort=False)["date"].transform("max")
+
+    try:
+        await _store_predictions(db, [
+            {
+                "symbol": row.symbol,
+                "model_version": version,
+                "as_of_date": row.as_of_date.date(),
+                "date": row.date.date(),
+                "actual_price": row.close_price,
+                "predicted_price": row.predicted_price,
+            }
+            for row in predictions.itertuples(index=False)
+        ])
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"Database error occurred: {str(e)}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
+
+    predictions["date"] = predictions["date"].dt.strftime('%Y-%m-%d')
+    found = set(predictions["symbol"])
+    response = {}
+    for symbol, group in predictions.groupby("symbol", sort=False):
+        response[symbol] = {
+            "dates": group["date"].tolist(),
+            "actual_prices": group["close_price"].tolist(),
+            "predicted_prices": group["predicted_price"].tolist(),
+        }
+        remember_prediction((symbol, version, group["as_of_date"].iloc[-1].date()), response[symbol])
+    return {
+        "predictions": response,
+        "inserted": len(predictions),
+        "missing": [symbol for symbol in request.symbols or [] if symbol not in found],
+    }
+
+
+@router.post('/predict/model/{symbol}', response_model=dict)
+async def predict_with_model(symbol: str, db: AsyncSession = Depends(get_db)):
+    # Artifacts load once, on first use; concurrent calls share one model.predict
+    registry = await inference.warm()
+
+    historical_data = await load_ohlcv(db, symbol)
+    if len(historical_data) < registry.lookback:
+        raise HTTPException(
+            status_code=404 if historical_data.empty else 400,
+            detail=f"The model needs at least {registry.lookback} closes; found {len(historical_data)}.",
+        )
+
+    window = historical_data['close_price'].to_numpy()[-registry.lookback:]
+    with span("model_inference"):
+        next_close = await inference.predict(window)
+    return {
+        "symbol": symbol,
+        "as_of": historical_data.index[-1].strftime('%Y-%m-%d'),
+        "predicted_next_close": next_close,
+    }
+
+
 @router.post('/predict/{symbol}', response_model=dict)
-async def predict_stock_prices(symbol: str ,db: AsyncSession = Depends(get_db)):
+async def predict_stock_prices(symbol: str, request: Request, db: AsyncSession = Depends(get_db)):
     try:
         # Check database session
         if db is None:
             raise HTTPException(status_code=500, detail="Database session is None.")
 
         # Fetch historical data for the stock symbol
-        result = await db.execute(select(models.StockData).filter(models.StockData.symbol == symbol))
-        historical_data = result.scalars().all()
+        historical_data = await load_ohlcv(db, symbol)
 
-        if not historical_data:
+        if historical_data.empty:
             raise HTTPException(status_code=404, detail="No historical data found for the specified symbol.")
 
-        # Convert historical data to DataFrame
-        data_dicts = [{"date": stock.date, "close_price": stock.close_price} for stock in historical_data]
-        df = pd.DataFrame(data_dicts)
-
-        # Filter the last 30 days of data
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.sort_values('date').tail(30)
-
-        # Prepare data for Linear Regression
-        df['days'] = (df['date'] - df['date'].min()).dt.days
-        X = df[['days']]
-        y = df['close_price']
-
-        # Fit a linear regression model
-        model = LinearRegression()
-        model.fit(X, y)
-
-        # Predict the prices for the same 30 days
-        predicted_prices = model.predict(X)
-
-        # Prepare predictions for insertion
-        prediction_entries = []
-        for i, (actual_price, predicted_price, prediction_date) in enumerate(zip(y, predicted_prices, df['date'])):
-            prediction_entry = models.PredictedStockData(
-                symbol="IBM",
-                date=prediction_date,
-                actual_price=actual_price,
-                predicted_price=predicted_price
-            )
-            prediction_entries.append(prediction_entry)
-
-        # Add all prediction entries to the session
-        db.add_all(prediction_entries)
-
-        # Commit the transaction
-        await db.commit()
-        
-        # Generate Plot
-        plt.figure(figsize=(12, 6))
-        plt.plot(df['date'], y, label='Actual Prices', marker='o', color='blue')
-        plt.plot(df['date'], predicted_prices, label='Predicted Prices', marker='x', color='orange')
-        plt.title('Actual vs Predicted Stock Prices')
-        plt.xlabel('Date')
-        plt.ylabel('Price')
-        plt.legend()
-        plt.grid()
-
-        plot_path = "static/prediction_plot.png"  # Save to static folder in the root of the project
-        if not os.path.exists("static"):
-            os.makedirs("static")
-
-        # Save the plot
-        plt.savefig(plot_path)
-        plt.close()  # Close the plot to free up memory
-
-        response_data = {
-            "actual_prices": y.tolist(),  # Convert pandas Series to list
-            "predicted_prices": predicted_prices.tolist(),
-            "dates": df['date'].dt.strftime('%Y-%m-%d').tolist(),  # Format dates
-            "plot_url": plot_path  # Include the plot URL in the response
-        }
-
-        return response_data
-
+        # A prediction only changes when a new bar arrives, so it is keyed by the latest bar date
+        version = model_version(PREDICTION_WINDOW)
+        as_of = historical_data.index[-1].date()
+        etag = response_etag("predict", symbol, historical_data, version=version)
+        cached = cached_response(request, symbol, etag)
+        if cached is not None:
+            return cached
+
+        memo_key = (symbol, version, as_of)
+        prediction = recall_prediction(memo_key)
+
+        if prediction is None:
+            stored = await fetch_frame(db, stored_predictions_query(symbol, version, as_of))
+            if not stored.empty:
+                # Already fitted by another worker (or before a restart)
+                prediction = {
+                    "actual_prices": stored['actual_price'].astype(float).tolist(),
+                    "predicted_prices": stored['predicted_price'].astype(float).tolist(),
+                    "dates": pd.to_datetime(stored['date']).dt.strftime('%Y-%m-%d').tolist(),
+                }
+
+        if prediction is None:
+            # Filter the last 30 days of data (copy, the cached frame is shared)
+            df = historical_data['close_price'].tail(PREDICTION_WINDOW).reset_index()
+
+            # Prepare data for Linear Regression
+            df['days'] = (df['date'] - df['date'].min()).dt.days
+            y = df['close_price']
+
+            # Fit a linear regression model and predict the same 30 days, off the event loop
+            with span("regression_fit"):
+                predicted_prices = await compute.run(fit_linear_trend, df['days'].tolist(), y.tolist())
+
+            # Upsert, so repeated calls for the same bar never duplicate rows
+            await _store_predictions(db, [
+                {
+                    "symbol": symbol,
+                    "model_version": version,
+                    "as_of_date": as_of,
+                    "date": prediction_date.date(),
+                    "actual_price": actual_price,
+                    "predicted_price": predicted_price,
+                }
+                for actual_price, predicted_price, prediction_date in zip(y, predicted_prices, df['date'])
+            ])
+
+            prediction = {
+                "actual_prices": y.tolist(),  # Convert pandas Series to list
+                "predicted_prices": predicted_prices.tolist(),
+                "dates": df['date'].dt.strftime('%Y-%m-%d').tolist(),  # Format dates
+            }
+        remember_prediction(memo_key, prediction)
+
+        # Generate Plot, unless this exact chart was already rendered
+        key = plot_key("prediction", symbol=symbol, last_date=as_of, version=version)
+        plot_path = cached_plot(key)
+        if plot_path is None:
+            with span("plot_render"):
+                plot_path = await compute.run(
+                    render_prediction_plot,
+                    key,
+                    pd.to_datetime(prediction["dates"]),
+                    prediction["actual_prices"],
+                    prediction["predicted_prices"],
+                )
+
+        # Include the plot URL in the response
+        return cache_response(request, symbol, etag, {**prediction, "plot_url": plot_path}, files=[plot_path])
+
+    except (HTTPException, ExecutorSaturated):
+        raise
     except SQLAlchemyError as e:
         await db.rollback()
         logger.error(f"Database error occurred: {str(e)}")
@@ -352,13 +593,119 @@ async def predict_stock_prices(symbol: str ,db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"An error occurred during prediction: {str(e)}")
 
 
+@router.get('/export')
+async def export_stock_data(
+    symbols: List[str] = Query(..., description="One or more symbols"),
+    start: Optional[date] = Query(None, description="First date to include"),
+    end: Optional[date] = Query(None, description="Last date to include"),
+    format: str = Query("arrow", description="arrow (IPC stream) or parquet"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Unsupported format")
+
+    with span("db_fetch"):
+        table = await fetch_export_table(db, symbols, start, end)
+    with span("serialize"):
+        body = await compute.run(serialize_table, table, format)
+
+    extension = "arrows" if format == "arrow" else "parquet"
+    return Response(
+        content=body,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="stock_data.{extension}"'},
+    )
+
+
+@router.get('/indicators/{symbol}', response_model=dict)
+async def get_indicators(
+    symbol: str,
+    indicators: Optional[List[str]] = Query(None, description="Keys such as sma(50), rsi(14), bollinger(20,2)"),
+    start: Optional[date] = Query(None, description="First date to include"),
+    end: Optional[date] = Query(None, description="Last date to include"),
+    db: AsyncSession = Depends(get_db),
+):
+    # Values are maintained on populate; this only reads them back
+    try:
+        frame = await load_indicators(db, symbol, indicators or DEFAULT_INDICATORS, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if frame.empty:
+        raise HTTPException(status_code=404, detail="No indicator values found for the specified symbol.")
+
+    wide = frame.pivot_table(index="date", columns=["indicator", "output"], values="value", sort=True)
+    wide = wide.astype(object).where(wide.notna(), None)  # Warm-up bars become null
+    values = {}
+    for key, output in wide.columns:
+        values.setdefault(key, {})[output] = wide[(key, output)].tolist()
+    return {
+        "symbol": symbol,
+        "dates": wide.index.strftime('%Y-%m-%d').tolist(),
+        "indicators": values,
+    }
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    return ohlcv_cache.stats()
+
+
+@router.get("/cache/responses/stats")
+async def response_cache_stats():
+    return response_cache.stats()
+
+
+@router.get("/model/stats")
+async def model_stats():
+    return inference.stats()
+
+
 @router.get("/report/{format}")
-async def get_report(format: str):
+async def get_report(
+    format: str,
+    symbol: str = Query(..., description="Stock symbol to report on"),
+    short_period: int = Query(50, description="Short moving average period"),
+    long_period: int = Query(200, description="Long moving average period"),
+    initial_cash: float = Query(10000.0, description="Initial investment amount"),
+    engine: str = Query("vector", description="Backtest engine: 'backtrader' or 'vector'"),
+    interval: str = Query("daily", description="Bar size: 'daily', 'weekly' or 'monthly'"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if format not in ("json", "pdf"):
+        raise HTTPException(status_code=400, detail="Unsupported format")
+    if engine not in ("backtrader", "vector"):
+        raise HTTPException(status_code=400, detail="Unsupported engine")
+    if interval not in INTERVALS:
+        raise HTTPException(status_code=400, detail="Unsupported interval")
+
+    df = await load_ohlcv(db, symbol, interval)
+    if df.empty:
+        raise HTTPException(status_code=404, detail="No stock data found.")
+
+    # Same parameters over the same bars always give the same report
+    key = report_key(symbol, short_period, long_period, initial_cash, engine, interval, df)
+    report = recall_report(key)
+    pdf_path = cached_plot(key, "pdf") if format == "pdf" else None
+
+    if report is None or (format == "pdf" and pdf_path is None):
+        with span("cerebro_run" if engine == "backtrader" else "vector_backtest"):
+            report, equity = await compute.run(
+                backtest_report, symbol, df, short_period, long_period, initial_cash, engine, interval
+            )
+        remember_report(key, report)
+        if format == "pdf":
+            # Laying out and writing the PDF is CPU-bound too
+            with span("pdf_render"):
+                pdf_path = await compute.run(
+                    render_report_pdf,
+                    key,
+                    f"{symbol} Performance Report ({report['start']} to {report['end']})",
+                    report["parameters"],
+                    {"final_value": report["final_value"], **report["metrics"]},
+                    df.index,
+                    equity,
+                )
+
     if format == "pdf":
-        pdf_path = "path/to/report.pdf"
-        return FileResponse(pdf_path, media_type="application/pdf", filename="report.pdf")
-    elif format == "json":
-        metrics = calculate_metrics(data)
-        return JSONResponse(content=metrics)
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported format")
\ No newline at end of file
+        return FileResponse(pdf_path, media_type="application/pdf", filename=f"{symbol}_report.pdf")
+    return report
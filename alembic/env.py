@@ -1,6 +1,7 @@
+import asyncio
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config
+from sqlalchemy.ext.asyncio import async_engine_from_config
 from sqlalchemy import pool
 from database import Base 
 target_metadata = Base.metadata
@@ -52,18 +53,35 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
-def run_migrations_online():
-    connectable = engine_from_config(
+def do_run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations():
+    # sqlalchemy.url uses the asyncpg driver, so migrate through an async engine
+    connectable = async_engine_from_config(
         config.get_section(config.config_ini_section),
         prefix='sqlalchemy.',
         poolclass=pool.NullPool,
     )
 
-    with connectable.connect() as connection:
-        context.configure(
-            connection=connection,
-            target_metadata=target_metadata,
-        )
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await connectable.dispose()
+
+
+def run_migrations_online():
+    asyncio.run(run_async_migrations())
+
 
-        with context.begin_transaction():
-            context.run_migrations()
\ No newline at end of file
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,47 @@
+"""Indicator state and values
+
+Revision ID: a7c3e9d25f41
+Revises: f2b6c84d1e37
+Create Date: 2026-10-18 15:12:07.204918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e9d25f41'
+down_revision: Union[str, None] = 'f2b6c84d1e37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'indicator_state',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('symbol', sa.String(), nullable=False),
+        sa.Column('indicator', sa.String(), nullable=False),
+        sa.Column('last_date', sa.Date(), nullable=False),
+        sa.Column('state', sa.JSON(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('symbol', 'indicator', name='uq_indicator_state_key'),
+    )
+    op.create_table(
+        'indicator_values',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('symbol', sa.String(), nullable=False),
+        sa.Column('indicator', sa.String(), nullable=False),
+        sa.Column('output', sa.String(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('symbol', 'indicator', 'output', 'date', name='uq_indicator_values_key'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('indicator_values')
+    op.drop_table('indicator_state')
@@ -0,0 +1,63 @@
+"""Weekly and monthly stock rollups
+
+Revision ID: b5e1f7a9c306
+Revises: a7c3e9d25f41
+Create Date: 2026-10-18 16:40:52.118630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e1f7a9c306'
+down_revision: Union[str, None] = 'a7c3e9d25f41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'stock_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('symbol', sa.String(), nullable=False),
+        sa.Column('period', sa.String(), nullable=False),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('open_price', sa.Float(), nullable=True),
+        sa.Column('close_price', sa.Float(), nullable=True),
+        sa.Column('high_price', sa.Float(), nullable=True),
+        sa.Column('low_price', sa.Float(), nullable=True),
+        sa.Column('volume', sa.BigInteger(), nullable=True),
+        sa.Column('bars', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('symbol', 'period', 'period_start', name='uq_stock_rollups_key'),
+    )
+
+    # Backfill from the existing daily bars; ingest keeps them current afterwards
+    for period, unit in (('weekly', 'week'), ('monthly', 'month')):
+        op.execute(
+            f"""
+            INSERT INTO stock_rollups
+                (symbol, period, period_start, date, open_price, close_price, high_price, low_price, volume, bars)
+            SELECT
+                symbol,
+                '{period}',
+                date_trunc('{unit}', date)::date,
+                MAX(date),
+                (array_agg(open_price ORDER BY date))[1],
+                (array_agg(close_price ORDER BY date DESC))[1],
+                MAX(high_price),
+                MIN(low_price),
+                SUM(volume),
+                COUNT(*)
+            FROM stock_data
+            GROUP BY symbol, date_trunc('{unit}', date)
+            """
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('stock_rollups')
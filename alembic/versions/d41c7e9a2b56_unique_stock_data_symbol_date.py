@@ -0,0 +1,34 @@
+"""Unique stock_data symbol and date
+
+Revision ID: d41c7e9a2b56
+Revises: 46bc5db343c2
+Create Date: 2026-10-18 11:40:12.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41c7e9a2b56'
+down_revision: Union[str, None] = '46bc5db343c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Re-populating used to duplicate rows; keep the newest copy of each bar
+    op.execute(
+        """
+        DELETE FROM stock_data a
+        USING stock_data b
+        WHERE a.symbol = b.symbol AND a.date = b.date AND a.id < b.id
+        """
+    )
+    op.create_unique_constraint('uq_stock_data_symbol_date', 'stock_data', ['symbol', 'date'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_stock_data_symbol_date', 'stock_data', type_='unique')
@@ -0,0 +1,44 @@
+"""Float stock_data prices
+
+Revision ID: e8f3a1c5d902
+Revises: d41c7e9a2b56
+Create Date: 2026-10-18 13:05:47.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8f3a1c5d902'
+down_revision: Union[str, None] = 'd41c7e9a2b56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRICE_COLUMNS = ['open_price', 'close_price', 'high_price', 'low_price']
+
+
+def upgrade() -> None:
+    # double precision reads back as Python float (no Decimal) and doesn't
+    # overflow at 99,999,999.99 like numeric(10, 2)
+    for column in PRICE_COLUMNS:
+        op.alter_column(
+            'stock_data',
+            column,
+            type_=sa.Float(),
+            existing_type=sa.Numeric(10, 2),
+            postgresql_using=f'{column}::double precision',
+        )
+
+
+def downgrade() -> None:
+    for column in PRICE_COLUMNS:
+        op.alter_column(
+            'stock_data',
+            column,
+            type_=sa.Numeric(10, 2),
+            existing_type=sa.Float(),
+            postgresql_using=f'{column}::numeric(10, 2)',
+        )
@@ -0,0 +1,62 @@
+"""Predicted stock data version key
+
+Revision ID: f2b6c84d1e37
+Revises: e8f3a1c5d902
+Create Date: 2026-10-18 13:48:21.550376
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b6c84d1e37'
+down_revision: Union[str, None] = 'e8f3a1c5d902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('predicted_stock_data', sa.Column('model_version', sa.String(), nullable=True))
+    op.add_column('predicted_stock_data', sa.Column('as_of_date', sa.Date(), nullable=True))
+
+    # Existing rows all came from the 30-day linear trend; treat each symbol's
+    # newest predicted date as the bar they were fitted on
+    op.execute(
+        """
+        UPDATE predicted_stock_data p
+        SET model_version = 'linear_trend_v1/30',
+            as_of_date = latest.as_of_date
+        FROM (
+            SELECT symbol, MAX(date) AS as_of_date
+            FROM predicted_stock_data
+            GROUP BY symbol
+        ) latest
+        WHERE p.symbol = latest.symbol
+        """
+    )
+    # Every repeat request used to insert another copy; keep the newest one
+    op.execute(
+        """
+        DELETE FROM predicted_stock_data a
+        USING predicted_stock_data b
+        WHERE a.symbol = b.symbol AND a.model_version = b.model_version
+          AND a.as_of_date = b.as_of_date AND a.date = b.date AND a.id < b.id
+        """
+    )
+
+    op.alter_column('predicted_stock_data', 'model_version', nullable=False)
+    op.alter_column('predicted_stock_data', 'as_of_date', nullable=False)
+    op.create_unique_constraint(
+        'uq_predicted_stock_data_key',
+        'predicted_stock_data',
+        ['symbol', 'model_version', 'as_of_date', 'date'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_predicted_stock_data_key', 'predicted_stock_data', type_='unique')
+    op.drop_column('predicted_stock_data', 'as_of_date')
+    op.drop_column('predicted_stock_data', 'model_version')
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import time
+
+import httpx
+
+DEFAULT_BASE_URL = "https://www.alphavantage.co/query"
+
+
+class AlphaVantageError(Exception):
+    """Alpha Vantage answered, but not with data (bad symbol, key or quota)."""
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` tokens per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AlphaVantageClient:
+    """Non-blocking Alpha Vantage client sharing one pooled HTTP connection set.
+
+    Every call waits on the token bucket before hitting the API, and transport
+    errors, 5xx/429 responses and quota notes are retried with backoff. Point
+    ``base_url`` (or ``transport``) at a local stand-in server for tests.
+    """
+
+    def __init__(
+        self,
+        api_key=None,
+        base_url=None,
+        requests_per_minute=None,
+        timeout=None,
+        retries=None,
+        max_connections=None,
+        transport=None,
+    ):
+        self.api_key = api_key or os.getenv("ALPHA_VANTAGE_API_KEY")
+        self.base_url = base_url or os.getenv("ALPHA_VANTAGE_BASE_URL", DEFAULT_BASE_URL)
+        self.retries = retries if retries is not None else int(os.getenv("ALPHA_VANTAGE_RETRIES", 3))
+        requests_per_minute = requests_per_minute or float(os.getenv("ALPHA_VANTAGE_REQUESTS_PER_MINUTE", 5))
+        self.limiter = TokenBucket(requests_per_minute / 60.0, max(1.0, requests_per_minute / 60.0))
+        self._client = httpx.AsyncClient(
+            timeout=timeout or float(os.getenv("ALPHA_VANTAGE_TIMEOUT", 30)),
+            limits=httpx.Limits(max_connections=max_connections or int(os.getenv("ALPHA_VANTAGE_MAX_CONNECTIONS", 10))),
+            transport=transport,
+        )
+
+    async def daily_series(self, symbol, outputsize="compact"):
+        """Raw TIME_SERIES_DAILY payload for ``symbol``."""
+        params = {
+            "function": "TIME_SERIES_DAILY",
+            "symbol": symbol,
+            "apikey": self.api_key,
+            "outputsize": outputsize,
+        }
+        return await self._get(params)
+
+    async def _get(self, params):
+        for attempt in range(self.retries + 1):
+            await self.limiter.acquire()
+            last_attempt = attempt == self.retries
+            try:
+                response = await self._client.get(self.base_url, params=params)
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+            else:
+                if response.status_code == 429 or response.status_code >= 500:
+                    if last_attempt:
+                        response.raise_for_status()
+                else:
+                    response.raise_for_status()
+                    payload = response.json()
+                    if "Error Message" in payload:
+                        raise AlphaVantageError(payload["Error Message"])
+                    # Quota messages come back as 200s with a note instead of data
+                    note = payload.get("Note") or payload.get("Information")
+                    if note is None:
+                        return payload
+                    if last_attempt:
+                        raise AlphaVantageError(note)
+            await asyncio.sleep(min(2 ** attempt, 30))
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+_client = None
+
+
+def get_alpha_vantage_client():
+    """Process-wide client, so every request shares one pool and one rate limit."""
+    global _client
+    if _client is None:
+        _client = AlphaVantageClient()
+    return _client
+
+
+async def close_alpha_vantage_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
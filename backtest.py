@@ -0,0 +1,191 @@
+import math
+
+import numpy as np
+
+from metrics import performance_metrics
+
+MAX_SWEEP_COMBINATIONS = 10000
+
+
+def simple_moving_average(values, period):
+    """Trailing simple moving average along the first axis, NaN until ``period`` values are available."""
+    values = np.asarray(values, dtype=float)
+    sma = np.full(values.shape, np.nan)
+    if period < 1 or period > len(values):
+        return sma
+    csum = np.cumsum(np.concatenate([np.zeros((1,) + values.shape[1:]), values]), axis=0)
+    sma[period - 1:] = (csum[period:] - csum[:-period]) / period
+    return sma
+
+
+def crossover_signal(close, short_period, long_period):
+    """Moving averages and the long/flat state of the crossover strategy.
+
+    ``close`` is either one price series or a (bars, symbols) matrix; every
+    column is handled in the same pass. The state is 1 while the short average
+    is above the long one, 0 while it is below, and ties keep the previous state.
+    """
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    short_ma = simple_moving_average(close, short_period)
+    long_ma = simple_moving_average(close, long_period)
+    ready = ~(np.isnan(short_ma) | np.isnan(long_ma))
+
+    # Cumulative sums drift by a few ulps, which flips exact ties between the
+    # averages; settle those bars with an exact window sum like backtrader does
+    for i, *column in np.argwhere(ready & np.isclose(short_ma, long_ma, rtol=1e-9, atol=0.0)):
+        at = (i, *column)
+        short_ma[at] = math.fsum(close[(slice(i - short_period + 1, i + 1), *column)]) / short_period
+        long_ma[at] = math.fsum(close[(slice(i - long_period + 1, i + 1), *column)]) / long_period
+
+    signal = np.where(short_ma > long_ma, 1.0, np.where(short_ma < long_ma, 0.0, np.nan))
+    signal[~ready] = 0.0
+    bar = np.arange(n).reshape((n,) + (1,) * (close.ndim - 1))
+    last_set = np.maximum.accumulate(np.where(np.isnan(signal), 0, bar), axis=0)
+    signal = np.nan_to_num(np.take_along_axis(signal, last_set, axis=0))
+    return short_ma, long_ma, signal, ready
+
+
+def simulate_positions(close, signal, initial_cash):
+    """Shares, cash and equity for one symbol trading ``signal`` all-in at the close."""
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    changes = np.diff(signal, prepend=0.0)
+    entries = np.flatnonzero(changes > 0)
+    exits = np.flatnonzero(changes < 0)
+
+    shares = np.zeros(n)
+    cash = np.full(n, float(initial_cash))
+    available = float(initial_cash)
+    # Only the share count depends on the previous trade, so loop per trade, not per bar
+    for i, entry in enumerate(entries):
+        exit_ = exits[i] if i < len(exits) else n
+        # Small epsilon so accumulated float error doesn't drop a whole share
+        size = np.floor(available / close[entry] + 1e-9)
+        remaining = available - size * close[entry]
+        shares[entry:exit_] = size
+        cash[entry:exit_] = remaining
+        if exit_ < n:
+            available = remaining + size * close[exit_]
+            cash[exit_:] = available
+
+    return shares, cash, cash + shares * close, len(entries)
+
+
+def vector_backtest(close, short_period, long_period, initial_cash):
+    """Run the moving average crossover strategy on whole arrays.
+
+    Mirrors ``MovingAverageCrossStrategy``: go all-in when the short average is
+    above the long one, close the position when it drops below, and fill at the
+    close of the signal bar. Returns the intermediate arrays so callers can
+    reuse them (e.g. the moving averages for plotting).
+    """
+    close = np.asarray(close, dtype=float)
+    short_ma, long_ma, signal, ready = crossover_signal(close, short_period, long_period)
+    shares, cash, equity, trades = simulate_positions(close, signal, initial_cash)
+    final_value = float(equity[-1]) if len(equity) else float(initial_cash)
+
+    return {
+        "short_ma": short_ma,
+        "long_ma": long_ma,
+        "signal": signal,
+        "shares": shares,
+        "cash": cash,
+        "equity": equity,
+        "predicted_price": close[ready & (short_ma != long_ma)].tolist(),
+        "trades": trades,
+        "final_value": final_value,
+        "total_return": final_value - initial_cash,
+    }
+
+
+def portfolio_backtest(close, weights, short_period, long_period, initial_cash):
+    """Run the crossover strategy over a (bars, symbols) close matrix.
+
+    Each symbol trades its own sleeve of ``initial_cash`` sized by its weight;
+    the signals for all symbols are computed together.
+    """
+    close = np.asarray(close, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    sleeves = initial_cash * weights / weights.sum()
+    _, _, signal, _ = crossover_signal(close, short_period, long_period)
+
+    equity = np.empty_like(close)
+    trades = []
+    for j, sleeve in enumerate(sleeves):
+        _, _, equity[:, j], count = simulate_positions(close[:, j], signal[:, j], sleeve)
+        trades.append(count)
+
+    total = equity.sum(axis=1)
+    final_value = float(total[-1]) if len(total) else float(initial_cash)
+    return {
+        "allocations": sleeves,
+        "equity": equity,
+        "total_equity": total,
+        "trades": trades,
+        "final_value": final_value,
+        "total_return": final_value - initial_cash,
+    }
+
+
+def run_backtrader(df, short_period, long_period, initial_cash):
+    """Run MovingAverageCrossStrategy through Cerebro on a date-indexed OHLCV frame.
+
+    Returns the same keys the plot and response need from ``vector_backtest``.
+    """
+    # backtrader is slow to import; only load it once a request asks for the Cerebro engine
+    import backtrader as bt
+
+    from strategies import EquityCurve, MovingAverageCrossStrategy
+
+    cerebro = bt.Cerebro()
+    data_feed = bt.feeds.PandasData(
+        dataname=df,
+        open='open_price',
+        high='high_price',
+        low='low_price',
+        close='close_price',
+        volume='volume',
+    )
+    cerebro.adddata(data_feed)
+    cerebro.addstrategy(MovingAverageCrossStrategy, short_period=short_period, long_period=long_period)
+    cerebro.addanalyzer(EquityCurve, _name='equity')
+    cerebro.broker.setcash(initial_cash)
+    # Fill orders at the close of the signal bar, same as the vector engine
+    cerebro.broker.set_coc(True)
+
+    cerebro.run()
+
+    strategy = cerebro.runstrats[0]
+    curve = strategy[0].analyzers.equity
+    final_value = cerebro.broker.getvalue()
+    return {
+        "equity": np.asarray(curve.equity),
+        "shares": np.asarray(curve.shares, dtype=float),
+        # Reuse the averages the strategy already computed instead of a second rolling pass
+        "short_ma": np.asarray(strategy[0].short_ma.array[:len(df)], dtype=float),
+        "long_ma": np.asarray(strategy[0].long_ma.array[:len(df)], dtype=float),
+        "predicted_price": strategy[0].predicted_price,
+        "final_value": final_value,
+        "total_return": final_value - initial_cash,
+    }
+
+
+def sweep_chunk(close, combos):
+    """Evaluate a slice of a parameter grid; runs inside a worker process."""
+    close = np.asarray(close, dtype=float)
+    rows = []
+    for short_period, long_period, initial_cash in combos:
+        result = vector_backtest(close, short_period, long_period, initial_cash)
+        metrics = performance_metrics(result["equity"], result["shares"])
+        del metrics["total_return_pct"]  # Already reported as return_pct
+        rows.append({
+            "short_period": short_period,
+            "long_period": long_period,
+            "initial_cash": initial_cash,
+            "final_value": result["final_value"],
+            "total_return": result["total_return"],
+            "return_pct": result["total_return"] / initial_cash * 100,
+            **metrics,
+        })
+    return rows
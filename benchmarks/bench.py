@@ -0,0 +1,371 @@
+"""Benchmarks for the ingest, display, backtest and predict paths.
+
+Runs the app in-process against a throwaway SQLite database (or any database
+URL you pass), feeds ingest from a canned Alpha Vantage payload and times both
+the individual stages and the end-to-end requests at several data sizes.
+Results are written as JSON so runs from different commits can be compared:
+
+    python benchmarks/bench.py --sizes 250,1000,5000 --repeat 5
+    python benchmarks/bench.py --compare old.json new.json
+
+The SQLite stand-in needs aiosqlite (``pip install -r requirements-dev.txt``).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Keep rendered charts out of static/ (read when plots is imported)
+WORK_DIR = tempfile.mkdtemp(prefix="stock-bench-")
+os.environ.setdefault("PLOT_CACHE_DIR", os.path.join(WORK_DIR, "plots"))
+
+import httpx
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import alpha_vantage
+import database
+import main
+import models
+import prediction
+import Routes.data as data_routes
+from backtest import run_backtrader, vector_backtest
+from executor import compute
+from data_access import OHLCV_COLUMNS, ohlcv_frame, stock_data_query
+from indicator_store import update_indicators
+from ingest import parse_daily_series, upsert_stock_rows
+from ohlcv_cache import ohlcv_cache
+from plots import PLOT_DIR, render_backtest_plot, render_prediction_plot
+from prediction import fit_linear_trend
+from response_cache import response_cache
+from rollups import refresh_rollups
+
+DEFAULT_SIZES = "250,1000,5000"
+BACKTRADER_MAX_BARS = 5000  # Cerebro is slow enough that bigger runs dominate the suite
+
+
+def synthetic_ohlcv(bars, seed=0, end=None):
+    """Business-day OHLCV frame from a geometric random walk, reproducible per seed."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=end or date.today(), periods=bars)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, bars)))
+    open_ = close * np.exp(rng.normal(0, 0.005, bars))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, bars))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, bars))
+    volume = rng.integers(100_000, 5_000_000, bars)
+    return pd.DataFrame(
+        {"open_price": open_, "high_price": high, "low_price": low, "close_price": close, "volume": volume},
+        index=dates.rename("date"),
+    ).round({"open_price": 4, "high_price": 4, "low_price": 4, "close_price": 4})
+
+
+def alpha_vantage_payload(frame):
+    """TIME_SERIES_DAILY response for ``frame``, newest first like the real API."""
+    return {
+        "Meta Data": {"1. Information": "Daily Prices (open, high, low, close) and Volumes"},
+        "Time Series (Daily)": {
+            row.Index.strftime('%Y-%m-%d'): {
+                "1. open": f"{row.open_price:.4f}",
+                "2. high": f"{row.high_price:.4f}",
+                "3. low": f"{row.low_price:.4f}",
+                "4. close": f"{row.close_price:.4f}",
+                "5. volume": str(row.volume),
+            }
+            for row in frame.iloc[::-1].itertuples()
+        },
+    }
+
+
+class Timings:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.rows = {}
+
+    @contextmanager
+    def stage(self, path, stage, bars, rows=None):
+        start = time.perf_counter()
+        yield
+        self.samples[(path, stage, bars)].append((time.perf_counter() - start) * 1000)
+        if rows is not None:
+            self.rows[(path, stage, bars)] = rows
+
+    def results(self):
+        return [
+            {
+                "path": path,
+                "stage": stage,
+                "bars": bars,
+                "rows": self.rows.get((path, stage, bars), bars),
+                "repeat": len(samples),
+                "min_ms": min(samples),
+                "median_ms": statistics.median(samples),
+                "mean_ms": statistics.fmean(samples),
+                "max_ms": max(samples),
+            }
+            for (path, stage, bars), samples in self.samples.items()
+        ]
+
+
+def _clear_plots():
+    shutil.rmtree(PLOT_DIR, ignore_errors=True)
+
+
+async def _clear_symbol(Session, symbol):
+    async with Session() as db:
+        for model in (models.StockData, models.IndicatorState, models.IndicatorValue, models.StockRollup, models.PredictedStockData):
+            await db.execute(delete(model).where(model.symbol == symbol))
+        await db.commit()
+    ohlcv_cache.invalidate(symbol)
+    response_cache.invalidate(symbol)
+
+
+async def bench_ingest(timings, Session, client, symbol, frame, payload, repeat):
+    bars = len(frame)
+    first = frame.index[0].date()
+    for _ in range(repeat):
+        await _clear_symbol(Session, symbol)
+        with timings.stage("ingest", "parse", bars):
+            rows = parse_daily_series(payload, symbol, first)
+        async with Session() as db:
+            with timings.stage("ingest", "upsert", bars):
+                await upsert_stock_rows(db, rows)
+            with timings.stage("ingest", "indicators", bars):
+                await update_indicators(db, symbol, rows)
+            with timings.stage("ingest", "rollups", bars):
+                await refresh_rollups(db, symbol, rows)
+            with timings.stage("ingest", "commit", bars):
+                await db.commit()
+
+    # End to end through the API; plan_fetch keeps at most two years of bars
+    kept = len(parse_daily_series(payload, symbol, date.today() - timedelta(days=2 * 365)))
+    for _ in range(repeat):
+        await _clear_symbol(Session, symbol)
+        with timings.stage("ingest", "request", bars, rows=kept):
+            response = await client.post(f"/data/populate/{symbol}", params={"incremental": "false"})
+        response.raise_for_status()
+
+    # Leave the full history in place for the read paths
+    await _clear_symbol(Session, symbol)
+    async with Session() as db:
+        rows = parse_daily_series(payload, symbol, first)
+        await upsert_stock_rows(db, rows)
+        await update_indicators(db, symbol, rows)
+        await refresh_rollups(db, symbol, rows)
+        await db.commit()
+
+
+async def bench_display(timings, Session, client, symbol, bars, repeat):
+    query = stock_data_query(symbol, ["date"] + OHLCV_COLUMNS)
+    for _ in range(repeat):
+        async with Session() as db:
+            connection = await db.connection()
+            with timings.stage("display", "fetch", bars):
+                result = await connection.execute(query)
+                rows = result.all()
+            with timings.stage("display", "frame_build", bars):
+                frame = ohlcv_frame(pd.DataFrame(rows, columns=list(result.keys())))
+        with timings.stage("display", "serialize", bars):
+            records = frame.reset_index()
+            records["date"] = records["date"].dt.date
+            json.dumps(jsonable_encoder(records.to_dict("records")))
+
+        ohlcv_cache.invalidate(symbol)
+        response_cache.invalidate(symbol)
+        with timings.stage("display", "request_cold", bars):
+            (await client.get(f"/data/display/{symbol}")).raise_for_status()
+        with timings.stage("display", "request_warm", bars):
+            (await client.get(f"/data/display/{symbol}")).raise_for_status()
+        with timings.stage("display", "request_csv", bars):
+            (await client.get(f"/data/display/{symbol}", params={"format": "csv"})).raise_for_status()
+
+
+async def bench_backtest(timings, client, symbol, frame, repeat):
+    bars = len(frame)
+    close = frame['close_price'].to_numpy()
+    short_period, long_period = 20, 50
+    for i in range(repeat):
+        with timings.stage("backtest", "compute_vector", bars):
+            result = vector_backtest(close, short_period, long_period, 10000.0)
+        if bars <= BACKTRADER_MAX_BARS:
+            with timings.stage("backtest", "compute_backtrader", bars):
+                run_backtrader(frame, short_period, long_period, 10000.0)
+        _clear_plots()
+        with timings.stage("backtest", "render", bars):
+            render_backtest_plot(
+                f"bench_backtest_{bars}_{i}", frame.index, close, result["short_ma"], result["long_ma"],
+                result["predicted_price"], result["final_value"],
+            )
+        with timings.stage("backtest", "serialize", bars):
+            json.dumps({"final_value": result["final_value"], "predicted_prices": result["predicted_price"]})
+
+        _clear_plots()
+        ohlcv_cache.invalidate(symbol)
+        response_cache.invalidate(symbol)
+        body = {"symbol": symbol, "short_period": short_period, "long_period": long_period,
+                "initial_cash": 10000.0, "engine": "vector"}
+        with timings.stage("backtest", "request_cold", bars):
+            (await client.post("/data/backtest", json=body)).raise_for_status()
+        with timings.stage("backtest", "request_warm", bars):
+            (await client.post("/data/backtest", json=body)).raise_for_status()
+
+
+async def bench_predict(timings, Session, client, symbol, frame, repeat):
+    bars = len(frame)
+    window = frame['close_price'].tail(30).reset_index()
+    days = (window['date'] - window['date'].min()).dt.days.tolist()
+    for i in range(repeat):
+        with timings.stage("predict", "fit", bars):
+            predicted = fit_linear_trend(days, window['close_price'].tolist())
+        _clear_plots()
+        with timings.stage("predict", "render", bars):
+            render_prediction_plot(f"bench_predict_{bars}_{i}", window['date'], window['close_price'].to_numpy(), predicted)
+
+        # Cold means nothing memoized, stored or rendered yet
+        _clear_plots()
+        prediction._prediction_memo.clear()
+        response_cache.invalidate(symbol)
+        async with Session() as db:
+            await db.execute(delete(models.PredictedStockData).where(models.PredictedStockData.symbol == symbol))
+            await db.commit()
+        with timings.stage("predict", "request_cold", bars):
+            (await client.post(f"/data/predict/{symbol}")).raise_for_status()
+        with timings.stage("predict", "request_warm", bars):
+            (await client.post(f"/data/predict/{symbol}")).raise_for_status()
+
+
+async def run(sizes, repeat, database_url):
+    engine = create_async_engine(database_url)
+    Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+
+    async def get_db():
+        async with Session() as session:
+            yield session
+
+    # Point the app at the stand-in database and a canned Alpha Vantage
+    main.app.dependency_overrides[database.get_db] = get_db
+    main.app.dependency_overrides[database.get_read_db] = get_db
+    data_routes.AsyncSessionLocal = Session
+    data_routes.ReadSessionLocal = Session
+    payloads = {}
+    alpha_vantage._client = alpha_vantage.AlphaVantageClient(
+        api_key="bench",
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json=payloads[request.url.params["symbol"]])),
+        requests_per_minute=1_000_000,
+    )
+
+    timings = Timings()
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for bars in sizes:
+            symbol = f"BENCH{bars}"
+            frame = synthetic_ohlcv(bars, seed=bars)
+            payloads[symbol] = alpha_vantage_payload(frame)
+            print(f"{bars} bars: ingest", flush=True)
+            await bench_ingest(timings, Session, client, symbol, frame, payloads[symbol], repeat)
+            print(f"{bars} bars: display", flush=True)
+            await bench_display(timings, Session, client, symbol, bars, repeat)
+            print(f"{bars} bars: backtest", flush=True)
+            await bench_backtest(timings, client, symbol, frame, repeat)
+            print(f"{bars} bars: predict", flush=True)
+            await bench_predict(timings, Session, client, symbol, frame, repeat)
+            await _clear_symbol(Session, symbol)
+
+    await alpha_vantage.close_alpha_vantage_client()
+    await engine.dispose()
+    compute.shutdown()
+    return timings.results()
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_path, new_path, threshold):
+    """Print median timings side by side; returns how many stages got slower than ``threshold``."""
+    with open(old_path) as f:
+        old = {(r["path"], r["stage"], r["bars"]): r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = {(r["path"], r["stage"], r["bars"]): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    print(f"{'path':<10} {'stage':<20} {'bars':>6} {'old ms':>10} {'new ms':>10} {'ratio':>7}")
+    for key in sorted(old.keys() & new.keys()):
+        old_ms, new_ms = old[key]["median_ms"], new[key]["median_ms"]
+        ratio = new_ms / old_ms if old_ms else float("inf")
+        flag = ""
+        if ratio > threshold:
+            regressions += 1
+            flag = "  slower"
+        print(f"{key[0]:<10} {key[1]:<20} {key[2]:>6} {old_ms:>10.2f} {new_ms:>10.2f} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated bar counts per symbol")
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per stage")
+    parser.add_argument("--database-url", help="Async SQLAlchemy URL; defaults to a temporary SQLite file")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two results files")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    try:
+        if args.compare:
+            sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+        sizes = [int(size) for size in args.sizes.split(",")]
+        database_url = args.database_url or f"sqlite+aiosqlite:///{os.path.join(WORK_DIR, 'bench.db')}"
+        results = asyncio.run(run(sizes, args.repeat, database_url))
+
+        commit = _git_commit()
+        started = datetime.now(timezone.utc)
+        output = args.output or os.path.join(
+            ROOT, "benchmarks", "results", f"{started:%Y%m%dT%H%M%S}-{commit or 'nogit'}.json"
+        )
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        with open(output, "w") as f:
+            json.dump({
+                "commit": commit,
+                "timestamp": started.isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "database": database_url.split(":", 1)[0],
+                "compute_executor": os.getenv("COMPUTE_EXECUTOR", "process"),
+                "sizes": sizes,
+                "results": results,
+            }, f, indent=2)
+
+        for r in results:
+            print(f"{r['path']:<10} {r['stage']:<20} {r['bars']:>6} {r['median_ms']:>10.2f} ms")
+        print(f"Wrote {output}")
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main_cli()
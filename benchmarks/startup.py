@@ -0,0 +1,85 @@
+"""Cold-start benchmark: import time and time to first response of a fresh API process.
+
+Each sample starts a new interpreter, imports ``main``, runs the startup
+hooks against a throwaway SQLite database and serves ``GET /``. The script
+reports the medians and which heavy dependencies were loaded by then:
+
+    python benchmarks/startup.py --repeat 5
+    python benchmarks/startup.py --warmup blocking --budget-ms 2500
+
+``--budget-ms`` exits non-zero when the median ready time is over budget, so
+the check can guard CI. The SQLite stand-in needs aiosqlite.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should only load on demand (or during warm-up)
+HEAVY_MODULES = ("backtrader", "matplotlib", "joblib", "sklearn", "tensorflow", "keras")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+
+main.engine = create_async_engine(sys.argv[1])
+with TestClient(main.app) as client:
+    started = time.perf_counter()
+    client.get("/").raise_for_status()
+    ready = time.perf_counter()
+    loaded = [name for name in sys.argv[2].split(",") if name in sys.modules]
+
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "startup_ms": (started - imported) * 1000,
+    "ready_ms": (ready - start) * 1000,
+    "loaded": loaded,
+}))
+"""
+
+
+def sample(database_url, warmup):
+    env = dict(os.environ, WARMUP_MODE=warmup, PYTHONWARNINGS="ignore")
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE, database_url, ",".join(HEAVY_MODULES)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes to start")
+    parser.add_argument("--warmup", default="off", choices=("off", "background", "blocking"), help="WARMUP_MODE for the app")
+    parser.add_argument("--budget-ms", type=float, help="Fail when the median ready time exceeds this")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="stock-startup-")
+    database_url = f"sqlite+aiosqlite:///{os.path.join(work_dir, 'startup.db')}"
+    samples = [sample(database_url, args.warmup) for _ in range(args.repeat)]
+
+    print(f"{'stage':<12} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    medians = {}
+    for stage in ("import_ms", "startup_ms", "ready_ms"):
+        values = [s[stage] for s in samples]
+        medians[stage] = statistics.median(values)
+        print(f"{stage[:-3]:<12} {medians[stage]:>10.1f} {min(values):>10.1f} {max(values):>10.1f}")
+    print(f"loaded at ready: {', '.join(samples[-1]['loaded']) or 'none of ' + ', '.join(HEAVY_MODULES)}")
+
+    if args.budget_ms is not None and medians["ready_ms"] > args.budget_ms:
+        print(f"ready time {medians['ready_ms']:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,131 @@
+import pandas as pd
+from sqlalchemy import Float, cast, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+import models
+from instrumentation import span
+
+stock_data = models.StockData.__table__
+stock_rollups = models.StockRollup.__table__
+
+# "daily" reads stock_data; the others read the pre-aggregated stock_rollups rows
+INTERVALS = ("daily", "weekly", "monthly")
+
+_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+PRICE_COLUMNS = ["open_price", "high_price", "low_price", "close_price"]
+OHLCV_COLUMNS = PRICE_COLUMNS + ["volume"]
+
+
+def _column(name, table=stock_data):
+    column = table.c[name]
+    if name in PRICE_COLUMNS:
+        # Prices are stored as double precision; the cast is a no-op there and
+        # keeps databases still on numeric(10, 2) from returning Decimal objects
+        return cast(column, Float).label(name)
+    return column
+
+
+def stock_data_query(symbols, columns, start=None, end=None, after=None, limit=None, interval="daily"):
+    """Column-projected Core select over stock_data (or its rollups).
+
+    ``symbols`` is one symbol or a list of them; rows come back ordered by
+    (symbol, date), which the unique (symbol, date) index serves directly.
+    ``after`` is an exclusive keyset cursor on date. Weekly and monthly bars
+    carry the same columns, dated by the last trading day of their period.
+    """
+    table = stock_data if interval == "daily" else stock_rollups
+    query = select(*(_column(name, table) for name in columns))
+    if table is stock_rollups:
+        query = query.where(table.c.period == interval)
+    if isinstance(symbols, str):
+        query = query.where(table.c.symbol == symbols).order_by(table.c.date)
+    else:
+        query = query.where(table.c.symbol.in_(symbols)).order_by(table.c.symbol, table.c.date)
+    if start is not None:
+        query = query.where(table.c.date >= start)
+    if end is not None:
+        query = query.where(table.c.date <= end)
+    if after is not None:
+        query = query.where(table.c.date > after)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def latest_closes_query(symbols, window):
+    """Latest ``window`` closes of each symbol (every symbol when ``symbols`` is None) in one query."""
+    recency = func.row_number().over(partition_by=stock_data.c.symbol, order_by=stock_data.c.date.desc())
+    recent = select(stock_data.c.symbol, stock_data.c.date, _column("close_price"), recency.label("recency"))
+    if symbols is not None:
+        recent = recent.where(stock_data.c.symbol.in_(symbols))
+    recent = recent.subquery()
+    return (
+        select(recent.c.symbol, recent.c.date, recent.c.close_price)
+        .where(recent.c.recency <= window)
+        .order_by(recent.c.symbol, recent.c.date)
+    )
+
+
+def stored_predictions_query(symbol, model_version, as_of_date):
+    predicted = models.PredictedStockData.__table__
+    return (
+        select(predicted.c.date, predicted.c.actual_price, predicted.c.predicted_price)
+        .where(
+            predicted.c.symbol == symbol,
+            predicted.c.model_version == model_version,
+            predicted.c.as_of_date == as_of_date,
+        )
+        .order_by(predicted.c.date)
+    )
+
+
+async def fetch_frame(db, query):
+    """Run ``query`` on the session's Core connection and return a DataFrame.
+
+    Skips ORM entity hydration and the identity map entirely; rows go
+    straight from the driver into pandas.
+    """
+    with span("db_fetch"):
+        connection = await db.connection()
+        result = await connection.execute(query)
+        return pd.DataFrame(result.all(), columns=list(result.keys()))
+
+
+async def fetch_ohlcv_frame(db, symbol, start=None, end=None, interval="daily"):
+    """Date-indexed frame of float OHLC prices and int volume for one symbol."""
+    return ohlcv_frame(await fetch_frame(db, stock_data_query(symbol, ["date"] + OHLCV_COLUMNS, start, end, interval=interval)))
+
+
+def ohlcv_frame(frame):
+    """Shape raw (date, OHLCV) rows into the date-indexed frame the analysis code expects."""
+    with span("frame_build"):
+        frame["date"] = pd.to_datetime(frame["date"])
+        frame = frame.set_index("date")
+        frame[PRICE_COLUMNS] = frame[PRICE_COLUMNS].astype(float)
+        frame["volume"] = frame["volume"].fillna(0).astype("int64")
+        return frame
+
+
+async def upsert_rows(db, table, rows, key_columns, update_columns, batch_size=1000):
+    """Insert or update plain-dict ``rows`` in ``table``, keyed on a unique constraint.
+
+    One ``INSERT ... ON CONFLICT DO UPDATE`` statement is executed with each
+    batch of rows as its parameter list (executemany), so it is compiled once
+    and cached instead of rebuilt per batch. Runs inside the caller's transaction.
+    """
+    dialect = db.bind.dialect.name
+    if dialect not in _INSERTS:
+        raise ValueError(f"Bulk upsert is not supported for the {dialect} dialect")
+
+    stmt = _INSERTS[dialect](table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c[column] for column in key_columns],
+        set_={column: stmt.excluded[column] for column in update_columns},
+    )
+    for start in range(0, len(rows), batch_size):
+        await db.execute(stmt, rows[start:start + batch_size])
+    return len(rows)
@@ -1,11 +1,42 @@
+import os
+
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 
-SQLALCHEMY_DATABASE_URL = 'postgresql+asyncpg://app_user:saad123@db/stock_db'
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", 'postgresql+asyncpg://app_user:saad123@db/stock_db')
+# Read-only traffic (display, backtests, reports) goes here; unset to read from the primary
+READ_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # Seconds; -1 keeps connections forever
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Prepared statements cached per asyncpg connection; set 0 behind pgbouncer in transaction mode
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))
+# SQL echo logs every statement synchronously; only turn it on to debug queries
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() in ("1", "true", "yes")
+
+
+def make_engine(url):
+    options = {"echo": SQL_ECHO, "pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    if url.startswith("postgresql+asyncpg"):
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            connect_args={
+                "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+                "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+            },
+        )
+    return create_async_engine(url, **options)
 
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=True)
+
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
+read_engine = make_engine(READ_REPLICA_URL) if READ_REPLICA_URL else engine
 
 # Create a configured "Session" class
 AsyncSessionLocal = sessionmaker(
@@ -13,6 +44,11 @@ AsyncSessionLocal = sessionmaker(
     class_=AsyncSession,
     expire_on_commit=False,
 )
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
 
 Base = declarative_base()
 
@@ -22,3 +58,11 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+async def get_read_db():
+    """Session for endpoints that only read; served by the replica when one is configured."""
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
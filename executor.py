@@ -0,0 +1,72 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+COMPUTE_EXECUTOR = os.getenv("COMPUTE_EXECUTOR", "process")  # "process" or "thread"
+COMPUTE_WORKERS = int(os.getenv("COMPUTE_WORKERS", os.cpu_count() or 1))
+COMPUTE_MAX_PENDING = int(os.getenv("COMPUTE_MAX_PENDING", COMPUTE_WORKERS * 4))
+
+
+class ExecutorSaturated(Exception):
+    """Raised instead of queueing more work once the compute executor is full."""
+
+
+class ComputeExecutor:
+    """Runs CPU-bound stages off the event loop with a bounded backlog.
+
+    ``max_pending`` caps running plus queued jobs; past that, ``run`` fails
+    fast with ExecutorSaturated so the API can shed load instead of letting
+    latency grow without bound.
+    """
+
+    def __init__(self, kind, workers, max_pending):
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._pool = None
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            pool_class = ProcessPoolExecutor if self.kind == "process" else ThreadPoolExecutor
+            self._pool = pool_class(max_workers=self.workers)
+        return self._pool
+
+    async def run(self, fn, *args, **kwargs):
+        # Only touched from the event loop thread, so a plain counter is enough
+        if self.pending >= self.max_pending:
+            raise ExecutorSaturated(f"{self.pending} compute jobs already pending")
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.pool, functools.partial(fn, *args, **kwargs))
+        finally:
+            self.pending -= 1
+
+    async def run_all(self, fn, jobs):
+        """Run ``fn(*args)`` for every tuple in ``jobs``; admitted all at once or not at all.
+
+        Checking the whole batch up front means a fan-out never gets half
+        submitted before the backlog fills up.
+        """
+        if self.pending + len(jobs) > self.max_pending:
+            raise ExecutorSaturated(f"{self.pending} compute jobs pending, {len(jobs)} more requested")
+        self.pending += len(jobs)
+        loop = asyncio.get_running_loop()
+        futures = [loop.run_in_executor(self.pool, functools.partial(fn, *args)) for args in jobs]
+        try:
+            return await asyncio.gather(*futures)
+        finally:
+            self.pending -= len(jobs)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+compute = ComputeExecutor(COMPUTE_EXECUTOR, COMPUTE_WORKERS, COMPUTE_MAX_PENDING)
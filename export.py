@@ -0,0 +1,69 @@
+import io
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from sqlalchemy.dialects import postgresql
+
+from data_access import stock_data_query
+
+EXPORT_SCHEMA = pa.schema([
+    ("symbol", pa.string()),
+    ("date", pa.date32()),
+    ("open_price", pa.float64()),
+    ("high_price", pa.float64()),
+    ("low_price", pa.float64()),
+    ("close_price", pa.float64()),
+    ("volume", pa.int64()),
+])
+
+EXPORT_FORMATS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+async def fetch_export_table(db, symbols, start=None, end=None):
+    """Load stock_data for ``symbols`` into an Arrow table.
+
+    On PostgreSQL the rows are streamed out with COPY and parsed by Arrow's
+    CSV reader, so no Python object is created per row. Other databases fall
+    back to a column-wise transpose of the result.
+    """
+    query = stock_data_query(symbols, EXPORT_SCHEMA.names, start, end)
+    connection = await db.connection()
+
+    if connection.dialect.name == "postgresql":
+        sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        raw = await connection.get_raw_connection()
+        buffer = io.BytesIO()
+
+        async def write(chunk):
+            buffer.write(chunk)
+
+        await raw.driver_connection.copy_from_query(sql, output=write, format="csv", header=True)
+        buffer.seek(0)
+        return pa_csv.read_csv(
+            buffer,
+            convert_options=pa_csv.ConvertOptions(column_types=EXPORT_SCHEMA),
+        ).select(EXPORT_SCHEMA.names)
+
+    result = await connection.execute(query)
+    rows = result.all()
+    columns = list(zip(*rows)) if rows else [[] for _ in EXPORT_SCHEMA.names]
+    return pa.Table.from_arrays(
+        # Let Arrow infer first (prices may arrive as Decimal), then cast to the export types
+        [pa.array(column).cast(field.type, safe=False) for column, field in zip(columns, EXPORT_SCHEMA)],
+        schema=EXPORT_SCHEMA,
+    )
+
+
+def serialize_table(table, format):
+    """Encode a table as an Arrow IPC stream or a Parquet file."""
+    sink = pa.BufferOutputStream()
+    if format == "parquet":
+        pq.write_table(table, sink, compression="zstd")
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,171 @@
+import os
+
+import pandas as pd
+from sqlalchemy import delete, select
+
+import models
+from data_access import fetch_frame, fetch_ohlcv_frame, upsert_rows
+from executor import compute
+from indicators import canonical_key, parse_indicator, run_indicator
+
+# Indicators every populated symbol keeps up to date
+DEFAULT_INDICATORS = os.getenv(
+    "DEFAULT_INDICATORS",
+    "sma(50) sma(200) ema(12) ema(26) rsi(14) bollinger(20,2) atr(14) macd(12,26,9)",
+).split()
+# Extra keys a symbol starts tracking on first request; anything else is computed per request
+# and never stored, so clients can't grow storage and populate cost without limit
+TRACKED_INDICATORS = DEFAULT_INDICATORS + os.getenv("TRACKED_INDICATORS", "").split()
+INDICATOR_MAX_KEYS = int(os.getenv("INDICATOR_MAX_KEYS", 16))
+
+indicator_state = models.IndicatorState.__table__
+indicator_values = models.IndicatorValue.__table__
+
+
+async def _store(db, symbol, key, state, last_date, rows):
+    await upsert_rows(
+        db,
+        indicator_state,
+        [{"symbol": symbol, "indicator": key, "last_date": last_date, "state": state}],
+        ["symbol", "indicator"],
+        ["last_date", "state"],
+    )
+    await upsert_rows(
+        db,
+        indicator_values,
+        [
+            {"symbol": symbol, "indicator": key, "output": output, "date": day, "value": value}
+            for day, output, value in rows
+        ],
+        ["symbol", "indicator", "output", "date"],
+        ["value"],
+    )
+
+
+def replay_indicators(keys, dates, high, low, close):
+    """Run every bar through each of ``keys``; returns (key, state, rows) per key.
+
+    Pure CPU work on plain lists, so it can run in the compute executor.
+    """
+    replayed = []
+    for key in keys:
+        indicator = parse_indicator(key)
+        rows = run_indicator(indicator, dates, high, low, close)
+        replayed.append((key, indicator.state(), rows))
+    return replayed
+
+
+async def _replay(keys, frame):
+    dates = [day.date() for day in frame.index]
+    return await compute.run(
+        replay_indicators,
+        keys,
+        dates,
+        frame['high_price'].tolist(),
+        frame['low_price'].tolist(),
+        frame['close_price'].tolist(),
+    )
+
+
+async def rebuild_indicators(db, symbol, keys, frame=None):
+    """Replay the symbol's full history through ``keys`` and store state and values."""
+    if frame is None:
+        frame = await fetch_ohlcv_frame(db, symbol)
+    if frame.empty:
+        return
+    last_date = frame.index[-1].date()
+    for key, state, rows in await _replay(keys, frame):
+        # History may have been revised, so drop values the replay doesn't overwrite
+        await db.execute(
+            delete(indicator_values).where(indicator_values.c.symbol == symbol, indicator_values.c.indicator == key)
+        )
+        await _store(db, symbol, key, state, last_date, rows)
+
+
+async def update_indicators(db, symbol, new_rows):
+    """Advance the symbol's indicators over freshly ingested bars.
+
+    Indicators whose stored state ends before the first new bar only process
+    the new bars, O(1) each. Anything else (first populate, or a re-fetch
+    that rewrote older bars) is rebuilt from the stored history. Runs inside
+    the caller's transaction.
+    """
+    if not new_rows:
+        return
+    new_rows = sorted(new_rows, key=lambda row: row["date"])
+    result = await db.execute(
+        select(indicator_state.c.indicator, indicator_state.c.last_date, indicator_state.c.state)
+        .where(indicator_state.c.symbol == symbol)
+    )
+    states = {row.indicator: row for row in result}
+
+    rebuild = []
+    for key in dict.fromkeys([canonical_key(key) for key in DEFAULT_INDICATORS] + list(states)):
+        stored = states.get(key)
+        if stored is None or stored.last_date >= new_rows[0]["date"]:
+            rebuild.append(key)
+            continue
+        indicator = parse_indicator(key, stored.state)
+        rows = run_indicator(
+            indicator,
+            [row["date"] for row in new_rows],
+            [row["high_price"] for row in new_rows],
+            [row["low_price"] for row in new_rows],
+            [row["close_price"] for row in new_rows],
+        )
+        await _store(db, symbol, key, indicator.state(), new_rows[-1]["date"], rows)
+
+    if rebuild:
+        await rebuild_indicators(db, symbol, rebuild)
+
+
+async def load_indicators(db, symbol, keys, start=None, end=None):
+    """Stored values of ``keys`` as a long (indicator, output, date, value) frame.
+
+    Keys in TRACKED_INDICATORS the symbol doesn't track yet are computed once
+    and stored, so later populates keep them current; commits when it had to
+    do that. Other untracked keys are computed from the bars for this request
+    only. Raises ValueError for unknown keys or more than INDICATOR_MAX_KEYS.
+    """
+    keys = list(dict.fromkeys(canonical_key(key) for key in keys))
+    if len(keys) > INDICATOR_MAX_KEYS:
+        raise ValueError(f"At most {INDICATOR_MAX_KEYS} indicators per request, got {len(keys)}")
+    for key in keys:
+        parse_indicator(key)  # Reject unknown names before touching the database
+
+    result = await db.execute(
+        select(indicator_state.c.indicator)
+        .where(indicator_state.c.symbol == symbol, indicator_state.c.indicator.in_(keys))
+    )
+    tracked = set(result.scalars())
+    trackable = {canonical_key(key) for key in TRACKED_INDICATORS}
+    missing = [key for key in keys if key not in tracked and key in trackable]
+    transient = [key for key in keys if key not in tracked and key not in trackable]
+    frame = None
+    if missing or transient:
+        frame = await fetch_ohlcv_frame(db, symbol)
+    if missing:
+        await rebuild_indicators(db, symbol, missing, frame)
+        await db.commit()
+
+    query = (
+        select(indicator_values.c.indicator, indicator_values.c.output, indicator_values.c.date, indicator_values.c.value)
+        .where(indicator_values.c.symbol == symbol, indicator_values.c.indicator.in_(keys))
+        .order_by(indicator_values.c.date)
+    )
+    if start is not None:
+        query = query.where(indicator_values.c.date >= start)
+    if end is not None:
+        query = query.where(indicator_values.c.date <= end)
+    values = await fetch_frame(db, query)
+    if transient and not frame.empty:
+        rows = [
+            (key, output, day, value)
+            for key, _, replayed in await _replay(transient, frame)
+            for day, output, value in replayed
+            if (start is None or day >= start) and (end is None or day <= end)
+        ]
+        computed = pd.DataFrame(rows, columns=values.columns)
+        values = pd.concat([values, computed], ignore_index=True) if not values.empty else computed
+    values["date"] = pd.to_datetime(values["date"])
+    return values
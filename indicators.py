@@ -0,0 +1,248 @@
+import inspect
+import math
+import re
+from collections import deque
+
+# Streaming indicators: each ``update`` folds in one bar in O(1) and returns a
+# dict of outputs, or None while the indicator is still warming up. ``state``
+# is JSON-serializable, so a stored indicator can resume where it stopped.
+
+
+class SMA:
+    name = "sma"
+    outputs = ("value",)
+
+    def __init__(self, period, state=None):
+        self.period = int(period)
+        state = state or {}
+        self.window = deque(state.get("window", []), maxlen=self.period)
+        # Re-add on restore so rounding drift doesn't survive across runs
+        self.total = math.fsum(self.window)
+
+    def update(self, high, low, close):
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(close)
+        self.total += close
+        if len(self.window) < self.period:
+            return None
+        return {"value": self.total / self.period}
+
+    def state(self):
+        return {"window": list(self.window)}
+
+
+class EMA:
+    name = "ema"
+    outputs = ("value",)
+
+    def __init__(self, period, state=None):
+        self.period = int(period)
+        self.alpha = 2.0 / (self.period + 1)
+        state = state or {}
+        self.count = state.get("count", 0)
+        self.seed = state.get("seed", 0.0)
+        self.value = state.get("value")
+
+    def update(self, high, low, close):
+        return self.push(close)
+
+    def push(self, x):
+        # Seeded with the simple average of the first ``period`` values, like backtrader
+        self.count += 1
+        if self.value is None:
+            self.seed += x
+            if self.count < self.period:
+                return None
+            self.value = self.seed / self.period
+        else:
+            self.value += self.alpha * (x - self.value)
+        return {"value": self.value}
+
+    def state(self):
+        return {"count": self.count, "seed": self.seed, "value": self.value}
+
+
+class RSI:
+    name = "rsi"
+    outputs = ("value",)
+
+    def __init__(self, period=14, state=None):
+        self.period = int(period)
+        state = state or {}
+        self.previous = state.get("previous")
+        self.count = state.get("count", 0)
+        self.gain_sum = state.get("gain_sum", 0.0)
+        self.loss_sum = state.get("loss_sum", 0.0)
+        self.avg_gain = state.get("avg_gain")
+        self.avg_loss = state.get("avg_loss")
+
+    def update(self, high, low, close):
+        if self.previous is None:
+            self.previous = close
+            return None
+        change = close - self.previous
+        self.previous = close
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+
+        # Wilder's smoothing, seeded with plain averages over the first period
+        self.count += 1
+        if self.avg_gain is None:
+            self.gain_sum += gain
+            self.loss_sum += loss
+            if self.count < self.period:
+                return None
+            self.avg_gain = self.gain_sum / self.period
+            self.avg_loss = self.loss_sum / self.period
+        else:
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+
+        if self.avg_loss == 0:
+            return {"value": 100.0}
+        return {"value": 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss)}
+
+    def state(self):
+        return {
+            "previous": self.previous,
+            "count": self.count,
+            "gain_sum": self.gain_sum,
+            "loss_sum": self.loss_sum,
+            "avg_gain": self.avg_gain,
+            "avg_loss": self.avg_loss,
+        }
+
+
+class Bollinger:
+    name = "bollinger"
+    outputs = ("mid", "upper", "lower")
+
+    def __init__(self, period=20, width=2.0, state=None):
+        self.period = int(period)
+        self.width = float(width)
+        state = state or {}
+        self.window = deque(state.get("window", []), maxlen=self.period)
+        self.total = math.fsum(self.window)
+        self.total_sq = math.fsum(x * x for x in self.window)
+
+    def update(self, high, low, close):
+        if len(self.window) == self.period:
+            oldest = self.window[0]
+            self.total -= oldest
+            self.total_sq -= oldest * oldest
+        self.window.append(close)
+        self.total += close
+        self.total_sq += close * close
+        if len(self.window) < self.period:
+            return None
+        mid = self.total / self.period
+        # Population standard deviation, clamped against tiny negative rounding
+        std = math.sqrt(max(self.total_sq / self.period - mid * mid, 0.0))
+        return {"mid": mid, "upper": mid + self.width * std, "lower": mid - self.width * std}
+
+    def state(self):
+        return {"window": list(self.window)}
+
+
+class ATR:
+    name = "atr"
+    outputs = ("value",)
+
+    def __init__(self, period=14, state=None):
+        self.period = int(period)
+        state = state or {}
+        self.previous = state.get("previous")
+        self.count = state.get("count", 0)
+        self.seed = state.get("seed", 0.0)
+        self.value = state.get("value")
+
+    def update(self, high, low, close):
+        if self.previous is None:
+            self.previous = close
+            return None
+        true_range = max(high - low, abs(high - self.previous), abs(low - self.previous))
+        self.previous = close
+
+        self.count += 1
+        if self.value is None:
+            self.seed += true_range
+            if self.count < self.period:
+                return None
+            self.value = self.seed / self.period
+        else:
+            self.value = (self.value * (self.period - 1) + true_range) / self.period
+        return {"value": self.value}
+
+    def state(self):
+        return {"previous": self.previous, "count": self.count, "seed": self.seed, "value": self.value}
+
+
+class MACD:
+    name = "macd"
+    outputs = ("macd", "signal", "histogram")
+
+    def __init__(self, fast=12, slow=26, signal=9, state=None):
+        state = state or {}
+        self.fast = EMA(fast, state.get("fast"))
+        self.slow = EMA(slow, state.get("slow"))
+        self.signal = EMA(signal, state.get("signal"))
+
+    def update(self, high, low, close):
+        fast = self.fast.push(close)
+        slow = self.slow.push(close)
+        if fast is None or slow is None:
+            return None
+        macd = fast["value"] - slow["value"]
+        signal = self.signal.push(macd)
+        if signal is None:
+            return None
+        return {"macd": macd, "signal": signal["value"], "histogram": macd - signal["value"]}
+
+    def state(self):
+        return {"fast": self.fast.state(), "slow": self.slow.state(), "signal": self.signal.state()}
+
+
+INDICATORS = {cls.name: cls for cls in (SMA, EMA, RSI, Bollinger, ATR, MACD)}
+
+_KEY = re.compile(r"^\s*(\w+)\s*\(([^)]*)\)\s*$")
+_PERIODS = ("period", "fast", "slow", "signal")
+
+
+def parse_indicator(key, state=None):
+    """Build an indicator from a key such as ``sma(50)`` or ``bollinger(20,2)``."""
+    match = _KEY.match(key)
+    if not match or match.group(1).lower() not in INDICATORS:
+        raise ValueError(f"Unknown indicator: {key!r}")
+    params = [float(p) if "." in p else int(p) for p in match.group(2).replace(" ", "").split(",") if p]
+    cls = INDICATORS[match.group(1).lower()]
+    try:
+        args = inspect.signature(cls).bind(*params, state=state)
+    except TypeError:
+        raise ValueError(f"Wrong parameters for indicator: {key!r}")
+    args.apply_defaults()
+    args = args.arguments
+    # Periods size the rolling windows; anything below 1 would fail deep inside update()
+    for name in _PERIODS:
+        if name in args and (not isinstance(args[name], int) or args[name] < 1):
+            raise ValueError(f"{name} must be a positive integer in {key!r}")
+    if cls is MACD and args["fast"] >= args["slow"]:
+        raise ValueError(f"fast must be shorter than slow in {key!r}")
+    return cls(*params, state=state)
+
+
+def canonical_key(key):
+    """Normalized spelling of an indicator key, used as its storage name."""
+    match = _KEY.match(key)
+    if not match:
+        raise ValueError(f"Unknown indicator: {key!r}")
+    return f"{match.group(1).lower()}({match.group(2).replace(' ', '')})"
+
+
+def run_indicator(indicator, dates, high, low, close):
+    """Feed bars through ``indicator``; returns (date, output, value) rows for every ready bar."""
+    rows = []
+    for day, h, l, c in zip(dates, high, low, close):
+        values = indicator.update(float(h), float(l), float(c))
+        if values is not None:
+            rows.extend((day, output, value) for output, value in values.items())
+    return rows
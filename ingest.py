@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+import models
+from data_access import INTERVALS, upsert_rows
+from database import READ_REPLICA_URL
+from indicator_store import update_indicators
+from instrumentation import span
+from rollups import refresh_rollups
+from ohlcv_cache import ohlcv_cache, reload_ohlcv
+from response_cache import response_cache
+
+UPSERT_BATCH_SIZE = 1000
+HISTORY_DAYS = 2 * 365
+# outputsize=compact returns the latest 100 trading days (~140 calendar days)
+COMPACT_MAX_GAP_DAYS = 120
+UPDATE_COLUMNS = ["open_price", "high_price", "low_price", "close_price", "volume"]
+
+
+async def upsert_stock_rows(db, rows, batch_size=UPSERT_BATCH_SIZE):
+    """Insert or update ``stock_data`` rows keyed on (symbol, date).
+
+    ``rows`` are plain dicts with the StockData column names, so re-populating
+    a symbol refreshes existing bars instead of duplicating them. Runs inside
+    the caller's transaction.
+    """
+    return await upsert_rows(
+        db, models.StockData.__table__, rows, ["symbol", "date"], UPDATE_COLUMNS, batch_size
+    )
+
+
+async def latest_stored_date(db, symbol):
+    """Most recent bar date stored for ``symbol``, or None if it has no rows."""
+    result = await db.execute(
+        select(func.max(models.StockData.date)).where(models.StockData.symbol == symbol)
+    )
+    return result.scalar()
+
+
+def plan_fetch(last_date, today=None):
+    """Pick the Alpha Vantage output size and the first date worth keeping.
+
+    Returns ``(outputsize, start)`` where ``start`` is inclusive. With nothing
+    stored we keep the last two years; otherwise only bars after ``last_date``.
+    """
+    today = today or date.today()
+    history_start = today - timedelta(days=HISTORY_DAYS)
+    if last_date is None or last_date < history_start:
+        return "full", history_start
+    outputsize = "compact" if (today - last_date).days <= COMPACT_MAX_GAP_DAYS else "full"
+    return outputsize, last_date + timedelta(days=1)
+
+
+def parse_daily_series(payload, symbol, start):
+    """Rows for every bar in a TIME_SERIES_DAILY payload dated on or after ``start``.
+
+    Alpha Vantage keys are ISO dates, so the filter compares strings and only
+    the kept rows get parsed.
+    """
+    daily_data = payload.get("Time Series (Daily)", {})
+    start_key = start.isoformat()
+    return [
+        {
+            "date": date.fromisoformat(day),
+            "symbol": symbol,
+            "open_price": float(values["1. open"]),
+            "high_price": float(values["2. high"]),
+            "low_price": float(values["3. low"]),
+            "close_price": float(values["4. close"]),
+            "volume": int(values["5. volume"]),
+        }
+        for day, values in daily_data.items()
+        if day >= start_key
+    ]
+
+
+async def ingest_symbol(db, client, symbol, incremental=True):
+    """Fetch and upsert the bars ``symbol`` is missing; returns the new rows."""
+    last_date = await latest_stored_date(db, symbol) if incremental else None
+    # End the read transaction so the pooled connection isn't held idle across the
+    # rate-limited fetch, which can wait for minutes
+    await db.rollback()
+    outputsize, start = plan_fetch(last_date)
+    with span("alpha_vantage_fetch"):
+        payload = await client.daily_series(symbol, outputsize=outputsize)
+
+    stock_entries = parse_daily_series(payload, symbol, start)
+    if not stock_entries:
+        return []
+
+    with span("db_write"):
+        await upsert_stock_rows(db, stock_entries)
+    # Same transaction, so bars, their indicator values and rollups land together
+    with span("indicator_update"):
+        await update_indicators(db, symbol, stock_entries)
+    with span("rollup_refresh"):
+        await refresh_rollups(db, symbol, stock_entries)
+    with span("db_write"):
+        await db.commit()
+
+    # Cached frames and response bodies for this symbol (every interval) are now stale
+    ohlcv_cache.invalidate(symbol)
+    response_cache.invalidate(symbol)
+    if READ_REPLICA_URL:
+        # Reads go to a replica that may not have this commit yet; refill from the primary
+        # so a lagging read can't cache the old bars until the next ingest
+        await reload_ohlcv(db, symbol, INTERVALS)
+    return stock_entries
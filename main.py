@@ -1,16 +1,27 @@
 
-from fastapi import FastAPI, Depends
+from dotenv import load_dotenv
+# Before the app modules, which read their settings from the environment at import
+load_dotenv()
+from fastapi import FastAPI, Depends, Header, HTTPException
 from fastapi.staticfiles import StaticFiles
 import models
 from database import engine, get_db
 import Routes.data as sdata
+from alpha_vantage import close_alpha_vantage_client
+from executor import ExecutorSaturated, compute
+from instrumentation import render_metrics, timing_middleware
+from model_registry import MODEL_PRELOAD, ModelUnavailable, inference
+from warmup import WARMUP_MODE, warm_up
+from profiling import PROFILE_SECRET, ProfilingMiddleware, list_profiles, profile_path, profile_summary, secret_matches
+import asyncio
 import asyncpg
-from dotenv import load_dotenv
+import logging
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response
+import os
 # Create the database tables
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 async def init_models():
     async with engine.begin() as conn:
@@ -30,6 +41,11 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# Opt-in cProfile of whole requests (X-Profile secret or PROFILE_SAMPLE_RATE)
+app.add_middleware(ProfilingMiddleware)
+# Added last, so it is the outermost middleware and request latency covers everything below it
+app.middleware("http")(timing_middleware)
+
 
 async def create_database(db_name: str):
     # Connect to the 'postgres' database or another existing database
@@ -49,6 +65,67 @@ async def create_database(db_name: str):
 async def startup_event():
     # await create_database("stock_db")
     await init_models()
+    if WARMUP_MODE == "blocking":
+        await warm_up()
+    elif WARMUP_MODE == "background":
+        # Start serving now; requests that need a module still loading wait on the import lock
+        app.state.warmup = asyncio.create_task(warm_up())
+    if MODEL_PRELOAD:
+        try:
+            await inference.warm()
+        except ModelUnavailable as e:
+            # Keep serving everything else; model endpoints answer 503 until it loads
+            logger.error(f"Model preload failed: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_alpha_vantage_client()
+    compute.shutdown()
+    await inference.shutdown()
+
+
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request, exc):
+    # Back-pressure: tell clients to retry rather than queueing work indefinitely
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly."},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(ModelUnavailable)
+async def model_unavailable_handler(request, exc):
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+@app.get("/metrics")
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+def require_profile_access(x_profile: str = Header(None)):
+    # Profiles expose code paths and arguments; guard them with the same secret as the trigger
+    if not PROFILE_SECRET:
+        raise HTTPException(status_code=403, detail="Profile access is disabled; set PROFILE_SECRET to enable it")
+    if not secret_matches(x_profile):
+        raise HTTPException(status_code=403, detail="Profile access requires the X-Profile secret")
+
+@app.get("/profiles", dependencies=[Depends(require_profile_access)])
+async def profiles():
+    return list_profiles()
+
+@app.get("/profiles/{request_id}", dependencies=[Depends(require_profile_access)])
+async def download_profile(request_id: str, format: str = "pstats"):
+    try:
+        path = profile_path(request_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found (never recorded or already pruned)")
+    if format == "text":
+        return PlainTextResponse(profile_summary(request_id))
+    if format != "pstats":
+        raise HTTPException(status_code=400, detail="format must be 'pstats' or 'text'")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{request_id}.prof")
 
 @app.get("/")
 async def read_backtest():
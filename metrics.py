@@ -0,0 +1,108 @@
+import math
+
+import numpy as np
+
+TRADING_DAYS_PER_YEAR = 252
+PERIODS_PER_YEAR = {"daily": TRADING_DAYS_PER_YEAR, "weekly": 52, "monthly": 12}
+
+# Every function works along the first axis, so a (bars, runs) matrix of equity
+# curves is scored in one call; 1-D curves give scalars.
+
+
+def period_returns(equity):
+    equity = np.asarray(equity, dtype=float)
+    return equity[1:] / equity[:-1] - 1.0
+
+
+def sharpe_ratio(equity, risk_free_rate=0.0, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """Annualized mean excess return over its standard deviation (NaN for flat curves)."""
+    excess = period_returns(equity) - risk_free_rate / periods_per_year
+    if len(excess) < 2:
+        return np.full(excess.shape[1:], np.nan)
+    std = excess.std(axis=0, ddof=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(std > 0, excess.mean(axis=0) / std * math.sqrt(periods_per_year), np.nan)
+
+
+def sortino_ratio(equity, risk_free_rate=0.0, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """Like Sharpe, but only penalizes downside deviation (NaN when there are no losses)."""
+    excess = period_returns(equity) - risk_free_rate / periods_per_year
+    if not len(excess):
+        return np.full(excess.shape[1:], np.nan)
+    downside = np.sqrt(np.mean(np.minimum(excess, 0.0) ** 2, axis=0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(downside > 0, excess.mean(axis=0) / downside * math.sqrt(periods_per_year), np.nan)
+
+
+def max_drawdown(equity):
+    """Largest peak-to-trough drop of an equity curve, as a negative fraction."""
+    equity = np.asarray(equity, dtype=float)
+    if not len(equity):
+        return np.zeros(equity.shape[1:])
+    peaks = np.maximum.accumulate(equity, axis=0)
+    return np.min(equity / peaks - 1.0, axis=0)
+
+
+def cagr(equity, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """Compound annual growth rate, with ``periods_per_year`` bars per year."""
+    equity = np.asarray(equity, dtype=float)
+    if len(equity) < 2:
+        return np.zeros(equity.shape[1:])
+    years = (len(equity) - 1) / periods_per_year
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(equity[0] > 0, (equity[-1] / equity[0]) ** (1.0 / years) - 1.0, np.nan)
+
+
+def exposure(shares):
+    """Fraction of bars with an open position."""
+    shares = np.asarray(shares, dtype=float)
+    if not len(shares):
+        return np.zeros(shares.shape[1:])
+    return np.mean(shares != 0, axis=0)
+
+
+def _round_trips(equity, shares):
+    # Equity before each entry and after each exit (or at the last bar while still open)
+    held = (np.asarray(shares) != 0).astype(np.int8)
+    edges = np.diff(held, prepend=0, append=0)
+    entries = np.flatnonzero(edges == 1)
+    exits = np.flatnonzero(edges == -1)
+    return equity[np.maximum(entries - 1, 0)], equity[np.minimum(exits, len(equity) - 1)]
+
+
+def win_rate(equity, shares):
+    """Share of round trips that closed (or are marked) above their entry value."""
+    equity = np.asarray(equity, dtype=float)
+    shares = np.asarray(shares, dtype=float)
+    if equity.ndim > 1:
+        return np.array([win_rate(equity[:, j], shares[:, j]) for j in range(equity.shape[1])])
+    start, end = _round_trips(equity, shares)
+    return float(np.mean(end > start)) if len(start) else np.nan
+
+
+def trade_count(shares):
+    held = np.asarray(shares) != 0
+    return np.count_nonzero(held[1:] & ~held[:-1], axis=0) + held[:1].sum(axis=0)
+
+
+def _scalar(value):
+    # NaN/inf aren't valid JSON; report undefined ratios as null
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def performance_metrics(equity, shares, risk_free_rate=0.0, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """Summary statistics of one equity curve and its position sizes, JSON-ready."""
+    equity = np.asarray(equity, dtype=float)
+    returns = period_returns(equity)
+    return {
+        "total_return_pct": _scalar((equity[-1] / equity[0] - 1.0) * 100) if len(equity) else 0.0,
+        "cagr": _scalar(cagr(equity, periods_per_year)),
+        "volatility": _scalar(returns.std(ddof=1) * math.sqrt(periods_per_year)) if len(returns) > 1 else None,
+        "sharpe_ratio": _scalar(sharpe_ratio(equity, risk_free_rate, periods_per_year)),
+        "sortino_ratio": _scalar(sortino_ratio(equity, risk_free_rate, periods_per_year)),
+        "max_drawdown": _scalar(max_drawdown(equity)),
+        "win_rate": _scalar(win_rate(equity, shares)),
+        "exposure": _scalar(exposure(shares)),
+        "trades": int(trade_count(shares)),
+    }
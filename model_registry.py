@@ -0,0 +1,164 @@
+import asyncio
+import os
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from executor import ExecutorSaturated
+
+MODEL_PATH = os.getenv("MODEL_PATH", os.path.join("models", "model.pkl"))
+SCALER_PATH = os.getenv("SCALER_PATH", os.path.join("models", "scaler.gz"))
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "false").lower() in ("1", "true", "yes")
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", 64))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", 5))
+INFERENCE_MAX_PENDING = int(os.getenv("INFERENCE_MAX_PENDING", 1024))
+DEFAULT_LOOKBACK = 60  # The shipped LSTM reads 60 scaled closes
+
+
+class ModelUnavailable(Exception):
+    """The trained model or its scaler could not be loaded."""
+
+
+class ModelRegistry:
+    """Loads the trained model and its scaler once and keeps them warm.
+
+    The model is a Keras network pickled together with a fitted MinMaxScaler;
+    ``predict`` maps a batch of raw close windows to the next close of each.
+    """
+
+    def __init__(self, model_path, scaler_path):
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.model = None
+        self.scaler = None
+        self.lookback = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            if self.model is None:
+                try:
+                    import joblib  # Also pulls in scikit-learn when the scaler unpickles
+
+                    scaler = joblib.load(self.scaler_path)
+                    with open(self.model_path, "rb") as f:
+                        model = pickle.load(f)
+                except Exception as e:
+                    # Missing files or a missing/incompatible keras install
+                    raise ModelUnavailable(f"Could not load model artifacts: {e}") from e
+                if not hasattr(scaler, "clip"):
+                    scaler.clip = False  # Scalers pickled before scikit-learn 0.24 predate the option
+                input_shape = getattr(model, "input_shape", None)
+                self.lookback = input_shape[1] if input_shape and input_shape[1] else DEFAULT_LOOKBACK
+                self.scaler = scaler
+                self.model = model
+        return self
+
+    def predict(self, windows):
+        """Next close for each row of a (batch, lookback) array: one transform, one predict."""
+        self.load()
+        windows = np.asarray(windows, dtype=float)
+        scaled = self.scaler.transform(windows.reshape(-1, 1)).reshape(len(windows), self.lookback, 1)
+        predicted = self.model.predict(scaled, batch_size=len(windows))
+        return self.scaler.inverse_transform(np.asarray(predicted).reshape(-1, 1)).ravel()
+
+
+class MicroBatcher:
+    """Coalesces concurrent inference requests into one model call.
+
+    The first queued request opens a batch; it closes once ``max_batch_size``
+    windows are waiting or ``max_wait`` seconds have passed. Loading and
+    predicting run on one dedicated thread, so the model is only ever
+    touched from there and never blocks the event loop.
+    """
+
+    def __init__(self, registry, max_batch_size, max_wait, max_pending):
+        self.registry = registry
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        self.batches = 0
+        self.requests = 0
+        self._queue = None
+        self._worker = None
+        self._loop = None
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+
+    async def warm(self):
+        """Load the artifacts (once) and return the registry."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self.registry.load)
+
+    async def predict(self, window):
+        loop = asyncio.get_running_loop()
+        # The queue and worker belong to one event loop; start them on first use
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._worker = loop.create_task(self._run())
+        future = loop.create_future()
+        try:
+            self._queue.put_nowait((np.asarray(window, dtype=float), future))
+        except asyncio.QueueFull:
+            raise ExecutorSaturated(f"{self.max_pending} inference requests already pending")
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Callers that gave up (client disconnects) don't need a prediction
+            batch = [(window, future) for window, future in batch if not future.done()]
+            if not batch:
+                continue
+            self.batches += 1
+            self.requests += len(batch)
+            try:
+                windows = np.stack([window for window, _ in batch])
+                predicted = await loop.run_in_executor(self._pool, self.registry.predict, windows)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), value in zip(batch, predicted):
+                    if not future.done():
+                        future.set_result(float(value))
+
+    def stats(self):
+        return {
+            "loaded": self.registry.model is not None,
+            "lookback": self.registry.lookback,
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+    async def shutdown(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+model_registry = ModelRegistry(MODEL_PATH, SCALER_PATH)
+inference = MicroBatcher(
+    model_registry,
+    INFERENCE_MAX_BATCH_SIZE,
+    INFERENCE_MAX_WAIT_MS / 1000,
+    INFERENCE_MAX_PENDING,
+)
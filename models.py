@@ -1,23 +1,70 @@
 from database import Base
-from sqlalchemy import Column, Float, ForeignKey, Integer, String, Boolean, TIMESTAMP, text,Numeric,Date
+from sqlalchemy import Column, Float, ForeignKey, Integer, String, Boolean, TIMESTAMP, text,Date,UniqueConstraint,JSON,BigInteger
 
 
 class StockData(Base):
     __tablename__="stock_data"
+    __table_args__ = (UniqueConstraint('symbol', 'date', name='uq_stock_data_symbol_date'),)
     id=Column(Integer,primary_key=True,nullable=False)
     symbol=Column(String,index=True)
     date = Column(Date, index=True)
-    open_price = Column(Numeric(10, 2))
-    close_price = Column(Numeric(10, 2))
-    high_price = Column(Numeric(10, 2))
-    low_price = Column(Numeric(10, 2))
+    open_price = Column(Float)
+    close_price = Column(Float)
+    high_price = Column(Float)
+    low_price = Column(Float)
     volume = Column(Integer)
     
     
+class StockRollup(Base):
+    # Weekly/monthly OHLCV bars, refreshed for the affected periods on ingest
+    __tablename__ = "stock_rollups"
+    __table_args__ = (UniqueConstraint('symbol', 'period', 'period_start', name='uq_stock_rollups_key'),)
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String, nullable=False)
+    period = Column(String, nullable=False)  # "weekly" or "monthly"
+    period_start = Column(Date, nullable=False)
+    date = Column(Date, nullable=False)  # Last trading day in the period
+    open_price = Column(Float)
+    close_price = Column(Float)
+    high_price = Column(Float)
+    low_price = Column(Float)
+    volume = Column(BigInteger)
+    bars = Column(Integer, nullable=False)
+
+
 class PredictedStockData(Base):
     __tablename__ = 'predicted_stock_data'
+    __table_args__ = (
+        UniqueConstraint('symbol', 'model_version', 'as_of_date', 'date', name='uq_predicted_stock_data_key'),
+    )
     id = Column(Integer, primary_key=True, index=True)
     symbol = Column(String, nullable=False)
     date = Column(Date, nullable=False)
     predicted_price = Column(Float, nullable=False)
-    actual_price=Column(Float,nullable=False)
\ No newline at end of file
+    actual_price=Column(Float,nullable=False)
+    model_version = Column(String, nullable=False)
+    as_of_date = Column(Date, nullable=False)  # Latest bar the prediction was fitted on
+
+
+class IndicatorState(Base):
+    # Running state of a streaming indicator, resumed when new bars arrive
+    __tablename__ = 'indicator_state'
+    __table_args__ = (UniqueConstraint('symbol', 'indicator', name='uq_indicator_state_key'),)
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String, nullable=False)
+    indicator = Column(String, nullable=False)  # e.g. "sma(50)", "bollinger(20,2)"
+    last_date = Column(Date, nullable=False)
+    state = Column(JSON, nullable=False)
+
+
+class IndicatorValue(Base):
+    __tablename__ = 'indicator_values'
+    __table_args__ = (
+        UniqueConstraint('symbol', 'indicator', 'output', 'date', name='uq_indicator_values_key'),
+    )
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String, nullable=False)
+    indicator = Column(String, nullable=False)
+    output = Column(String, nullable=False)  # "value", or e.g. "upper" for bands
+    date = Column(Date, nullable=False)
+    value = Column(Float, nullable=False)
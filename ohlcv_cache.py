@@ -0,0 +1,134 @@
+import os
+import threading
+from collections import OrderedDict
+
+from data_access import fetch_ohlcv_frame
+
+
+class OHLCVCache:
+    """Symbol-keyed LRU cache of ready-made OHLCV frames, bounded by memory.
+
+    Frames are indexed by date and hold float price columns, so callers can
+    hand them straight to pandas/NumPy. Treat returned frames as read-only.
+    Daily frames are keyed by symbol, rollups by (symbol, interval).
+
+    Invalidating a symbol bumps its generation; ``put_if_current`` drops a
+    frame whose read started before that, so an in-flight (possibly lagging)
+    read can't store bars older than the invalidation.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._frames = OrderedDict()
+        self._sizes = {}
+        self._generations = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, symbol):
+        with self._lock:
+            frame = self._frames.get(symbol)
+            if frame is None:
+                self.misses += 1
+                return None
+            self._frames.move_to_end(symbol)
+            self.hits += 1
+            return frame
+
+    def put(self, symbol, frame):
+        size = int(frame.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            self._store(symbol, frame, size)
+
+    def generation(self, symbol):
+        with self._lock:
+            return self._epoch, self._generations.get(symbol, 0)
+
+    def put_if_current(self, key, frame, generation):
+        """``put`` unless the symbol was invalidated since ``generation`` or the key was refilled meanwhile."""
+        symbol = key[0] if isinstance(key, tuple) else key
+        size = int(frame.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            if (self._epoch, self._generations.get(symbol, 0)) == generation and key not in self._frames:
+                self._store(key, frame, size)
+
+    def invalidate(self, symbol=None):
+        with self._lock:
+            if symbol is None:
+                self._epoch += 1
+                self._frames.clear()
+                self._sizes.clear()
+                self.current_bytes = 0
+            else:
+                self._generations[symbol] = self._generations.get(symbol, 0) + 1
+                for key in [key for key in self._frames if key == symbol or (isinstance(key, tuple) and key[0] == symbol)]:
+                    self._discard(key)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "symbols": len(self._frames),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _store(self, symbol, frame, size):
+        self._discard(symbol)
+        if size > self.max_bytes:
+            return
+        self._frames[symbol] = frame
+        self._sizes[symbol] = size
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            oldest = next(iter(self._frames))
+            self._discard(oldest)
+            self.evictions += 1
+
+    def _discard(self, symbol):
+        if symbol in self._frames:
+            del self._frames[symbol]
+            self.current_bytes -= self._sizes.pop(symbol)
+
+
+ohlcv_cache = OHLCVCache(int(os.getenv("OHLCV_CACHE_MAX_BYTES", 256 * 1024 * 1024)))
+
+
+def _key(symbol, interval):
+    return symbol if interval == "daily" else (symbol, interval)
+
+
+async def load_ohlcv(db, symbol, interval="daily"):
+    """Return the symbol's OHLCV frame from the cache, querying the database on a miss."""
+    key = _key(symbol, interval)
+    frame = ohlcv_cache.get(key)
+    if frame is not None:
+        return frame
+
+    generation = ohlcv_cache.generation(symbol)
+    frame = await fetch_ohlcv_frame(db, symbol, interval=interval)
+    # Don't cache misses so a later populate is picked up right away
+    if not frame.empty:
+        ohlcv_cache.put_if_current(key, frame, generation)
+    return frame
+
+
+async def reload_ohlcv(db, symbol, intervals):
+    """Replace the symbol's cached frames with fresh reads through ``db`` (the primary after an ingest).
+
+    Invalidating first makes reads already in flight discard their results,
+    and reads that miss afterwards won't replace the frames stored here.
+    """
+    ohlcv_cache.invalidate(symbol)
+    for interval in intervals:
+        frame = await fetch_ohlcv_frame(db, symbol, interval=interval)
+        if not frame.empty:
+            ohlcv_cache.put(_key(symbol, interval), frame)
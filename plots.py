@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+
+PLOT_DIR = os.getenv("PLOT_CACHE_DIR", os.path.join("static", "plots"))
+PLOT_CACHE_MAX_BYTES = int(os.getenv("PLOT_CACHE_MAX_BYTES", 100 * 1024 * 1024))
+
+
+def plot_key(kind, **inputs):
+    """Content address for a chart: the same inputs always map to the same file."""
+    digest = hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+    return f"{kind}_{digest[:32]}"
+
+
+def plot_path(key, ext="png"):
+    return os.path.join(PLOT_DIR, f"{key}.{ext}")
+
+
+def cached_plot(key, ext="png"):
+    """Path of an already rendered chart, or None. Hits are marked recently used."""
+    path = plot_path(key, ext)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def evict_plots(max_bytes=PLOT_CACHE_MAX_BYTES):
+    """Delete the least recently used charts and reports until the cache fits in ``max_bytes``."""
+    try:
+        entries = [entry for entry in os.scandir(PLOT_DIR) if entry.name.endswith((".png", ".pdf"))]
+    except FileNotFoundError:
+        return
+    files = []
+    for entry in entries:
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # Another worker evicted it first
+        total -= size
+
+
+def _figure(**kwargs):
+    # matplotlib takes about half a second to import; leave it to the first render
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.figure import Figure
+
+    return Figure(**kwargs)
+
+
+def _save(fig, key, ext="png"):
+    # Figures are independent objects (no pyplot state), so renders can run in
+    # parallel; write to a private temp file and rename so readers never see a partial file
+    path = plot_path(key, ext)
+    os.makedirs(PLOT_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        fig.savefig(tmp_path, format=ext)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    evict_plots()
+    return path
+
+
+def render_backtest_plot(key, dates, close, short_mavg, long_mavg, predicted_price, final_value):
+    # Define the date range for predictions
+    predicted_dates = pd.date_range(start=dates[-1] + pd.Timedelta(days=1),
+                                    periods=len(predicted_price), freq='B')  # Business days
+
+    fig = _figure(figsize=(14, 7))
+    ax = fig.subplots()
+
+    # Historical close prices and both moving averages share the data's dates
+    ax.plot(dates, close, label='Historical Close Prices', color='black', linewidth=1.5)
+    ax.plot(dates, short_mavg, label='Short Moving Average', color='orange', linestyle='--')
+    ax.plot(dates, long_mavg, label='Long Moving Average', color='green', linestyle='--')
+
+    # Plot predicted prices against the new predicted_dates
+    ax.plot(predicted_dates, predicted_price, label='Predicted Prices(Strategy usage)', color='blue', linestyle='dotted')
+
+    # Indicate the final portfolio value
+    ax.axhline(y=final_value, color='red', linestyle='--', label='Final Portfolio Value')
+
+    ax.set_title('Backtest Results with Strategy Performance')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Price')
+    ax.legend()
+    ax.grid()
+    return _save(fig, key)
+
+
+def render_portfolio_plot(key, dates, symbols, equity, total_equity):
+    fig = _figure(figsize=(14, 7))
+    ax = fig.subplots()
+    for j, symbol in enumerate(symbols):
+        ax.plot(dates, equity[:, j], label=symbol, linewidth=1)
+    ax.plot(dates, total_equity, label='Portfolio', color='black', linewidth=2)
+    ax.set_title('Portfolio Backtest Equity')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Value')
+    ax.legend()
+    ax.grid()
+    return _save(fig, key)
+
+
+def render_prediction_plot(key, dates, actual_prices, predicted_prices):
+    fig = _figure(figsize=(12, 6))
+    ax = fig.subplots()
+    ax.plot(dates, actual_prices, label='Actual Prices', marker='o', color='blue')
+    ax.plot(dates, predicted_prices, label='Predicted Prices', marker='x', color='orange')
+    ax.set_title('Actual vs Predicted Stock Prices')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Price')
+    ax.legend()
+    ax.grid()
+    return _save(fig, key)
+
+
+def render_report_pdf(key, title, parameters, metrics, dates, equity):
+    """One-page PDF: run parameters, the metrics table and the equity curve."""
+    fig = _figure(figsize=(8.27, 11.69))  # A4 portrait
+    fig.suptitle(title, fontsize=16)
+    table_ax, chart_ax = fig.subplots(2, 1, gridspec_kw={"height_ratios": [1, 1]})
+
+    rows = [[name.replace('_', ' ').title(), value] for name, value in parameters.items()]
+    rows += [
+        [name.replace('_', ' ').title(), "n/a" if value is None else f"{value:,.4f}" if isinstance(value, float) else value]
+        for name, value in metrics.items()
+    ]
+    table_ax.axis('off')
+    table = table_ax.table(cellText=rows, colLabels=['Metric', 'Value'], loc='center', cellLoc='left')
+    table.scale(1, 1.4)
+
+    chart_ax.plot(dates, equity, color='black', linewidth=1)
+    chart_ax.set_title('Equity Curve')
+    chart_ax.set_xlabel('Date')
+    chart_ax.set_ylabel('Value')
+    chart_ax.grid()
+    return _save(fig, key, "pdf")
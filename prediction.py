@@ -0,0 +1,90 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MODEL_VERSION = "linear_trend_v1"
+PREDICTION_MEMO_SIZE = 1024
+
+# (symbol, model version, as-of date) -> response; a newer bar changes the key
+_prediction_memo = OrderedDict()
+
+
+def model_version(window):
+    """Version tag stored with predictions; the window changes the fit, so it's part of it."""
+    return f"{MODEL_VERSION}/{window}"
+
+
+def recall_prediction(key):
+    result = _prediction_memo.get(key)
+    if result is not None:
+        _prediction_memo.move_to_end(key)
+    return result
+
+
+def remember_prediction(key, result):
+    _prediction_memo[key] = result
+    _prediction_memo.move_to_end(key)
+    while len(_prediction_memo) > PREDICTION_MEMO_SIZE:
+        _prediction_memo.popitem(last=False)
+
+
+def fit_linear_trends(days, prices, mask=None):
+    """Least-squares line per row of (series, points) matrices, solved in one pass.
+
+    ``mask`` marks the valid points of each row so series of different lengths
+    can share a padded matrix. Returns the fitted prices (NaN where masked)
+    plus the per-series slope and intercept.
+    """
+    days = np.asarray(days, dtype=float)
+    prices = np.asarray(prices, dtype=float)
+    mask = np.ones(days.shape, dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+
+    x = np.where(mask, days, 0.0)
+    y = np.where(mask, prices, 0.0)
+    n = mask.sum(axis=1)
+    sum_x = x.sum(axis=1)
+    sum_y = y.sum(axis=1)
+    sum_xy = (x * y).sum(axis=1)
+    sum_xx = (x * x).sum(axis=1)
+
+    denominator = n * sum_xx - sum_x ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # A single point (or identical x values) has no slope; fall back to the mean
+        slope = np.where(denominator != 0, (n * sum_xy - sum_x * sum_y) / denominator, 0.0)
+        intercept = np.where(n > 0, (sum_y - slope * sum_x) / n, np.nan)
+
+    fitted = np.where(mask, slope[:, None] * days + intercept[:, None], np.nan)
+    return fitted, slope, intercept
+
+
+def fit_linear_trend(days, prices):
+    """Fit a straight line through (day offset, price) and return the fitted prices."""
+    fitted, _, _ = fit_linear_trends([days], [prices])
+    return fitted[0]
+
+
+def fit_symbol_trends(frame):
+    """Fit a trend line per symbol of a long (symbol, date, close_price) frame.
+
+    Rows are scattered into padded (symbol, point) matrices so every symbol is
+    solved by the same vectorized ``fit_linear_trends`` call. Returns a copy of
+    the frame with ``predicted_price`` added.
+    """
+    frame = frame.copy()
+    frame["date"] = pd.to_datetime(frame["date"])
+    codes, symbols = pd.factorize(frame["symbol"])
+    position = frame.groupby("symbol", sort=False).cumcount().to_numpy()
+    days = (frame["date"] - frame.groupby("symbol", sort=False)["date"].transform("min")).dt.days.to_numpy()
+
+    shape = (len(symbols), position.max() + 1 if len(frame) else 0)
+    x = np.zeros(shape)
+    y = np.zeros(shape)
+    mask = np.zeros(shape, dtype=bool)
+    x[codes, position] = days
+    y[codes, position] = frame["close_price"].to_numpy(dtype=float)
+    mask[codes, position] = True
+
+    fitted, _, _ = fit_linear_trends(x, y, mask)
+    frame["predicted_price"] = fitted[codes, position]
+    return frame
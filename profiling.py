@@ -0,0 +1,165 @@
+import asyncio
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import re
+import time
+import uuid
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0.0))
+# The X-Profile header and the /profiles endpoints only work once this is set
+PROFILE_SECRET = os.getenv("PROFILE_SECRET")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", 200))
+PROFILE_MAX_BYTES = int(os.getenv("PROFILE_MAX_BYTES", 100 * 1024 * 1024))
+PROFILE_HEADER = b"x-profile"
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# cProfile hooks the whole thread, so only one request can be profiled at a time
+_active = False
+
+
+def _header(scope, name):
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def secret_matches(value):
+    """Constant-time check of a client-supplied value against PROFILE_SECRET (False when unset)."""
+    if not PROFILE_SECRET or value is None:
+        return False
+    return hmac.compare_digest(value.encode("latin-1", "replace"), PROFILE_SECRET.encode("latin-1", "replace"))
+
+
+def _requested(scope):
+    # Without a secret anyone could slow a worker on demand; only sampling stays available
+    return secret_matches(_header(scope, PROFILE_HEADER))
+
+
+def profile_path(request_id, ext="prof"):
+    if not _REQUEST_ID.match(request_id):
+        raise ValueError("Invalid request id")
+    return os.path.join(PROFILE_DIR, f"{request_id}.{ext}")
+
+
+def list_profiles():
+    """Metadata of the stored profiles, newest first."""
+    try:
+        entries = [entry.path for entry in os.scandir(PROFILE_DIR) if entry.name.endswith(".json")]
+    except FileNotFoundError:
+        return []
+    profiles = []
+    for path in entries:
+        try:
+            with open(path) as f:
+                profiles.append(json.load(f))
+        except (FileNotFoundError, ValueError):
+            continue  # Pruned or half-written
+    return sorted(profiles, key=lambda meta: meta["started"], reverse=True)
+
+
+def profile_summary(request_id, limit=50):
+    """Top functions by cumulative time, as pstats prints them."""
+    stream = io.StringIO()
+    stats = pstats.Stats(profile_path(request_id), stream=stream)
+    stats.sort_stats("cumulative").print_stats(limit)
+    return stream.getvalue()
+
+
+def prune_profiles(max_files=PROFILE_MAX_FILES, max_bytes=PROFILE_MAX_BYTES):
+    """Delete the oldest profiles until both the count and size limits hold."""
+    try:
+        entries = [entry for entry in os.scandir(PROFILE_DIR) if entry.name.endswith(".prof")]
+    except FileNotFoundError:
+        return
+    files = []
+    for entry in entries:
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+    files.sort(reverse=True)
+
+    kept_bytes = 0
+    for count, (_, size, path) in enumerate(files, start=1):
+        kept_bytes += size
+        if count > max_files or kept_bytes > max_bytes:
+            for stale in (path, path[:-len(".prof")] + ".json"):
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
+
+
+def _save(profiler, meta):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profiler.dump_stats(profile_path(meta["request_id"]))
+    with open(profile_path(meta["request_id"], "json"), "w") as f:
+        json.dump(meta, f)
+    prune_profiles()
+
+
+class ProfilingMiddleware:
+    """Profile a request with cProfile when sampled or asked via the X-Profile secret.
+
+    Unprofiled requests only pay for a header scan (and a random draw when
+    sampling is on). Profiled responses carry ``X-Profile-Id``; the pstats
+    file can then be fetched from ``/profiles/{id}``. Work handed to the
+    process pool shows up as time spent awaiting it, not as its own frames.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _active
+        if (
+            scope["type"] != "http"
+            or _active
+            or scope["path"].startswith("/profiles")
+            or not (_requested(scope) or (PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        # A server-side suffix keeps a reused X-Request-ID from overwriting an earlier profile
+        incoming = _header(scope, b"x-request-id")
+        suffix = uuid.uuid4().hex
+        request_id = f"{incoming[:48]}-{suffix[:12]}" if incoming and _REQUEST_ID.match(incoming) else suffix
+        status = None
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-profile-id", request_id.encode())]
+            await send(message)
+
+        started = time.time()
+        profiler = cProfile.Profile()
+        _active = True
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.disable()
+            _active = False
+            meta = {
+                "request_id": request_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                "started": started,
+                "duration_ms": (time.time() - started) * 1000,
+            }
+            # Writing the stats is file I/O; keep it off the event loop
+            await asyncio.get_running_loop().run_in_executor(None, _save, profiler, meta)
@@ -0,0 +1,68 @@
+import os
+from collections import OrderedDict
+
+from backtest import run_backtrader, vector_backtest
+from metrics import PERIODS_PER_YEAR, performance_metrics
+from plots import plot_key
+
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", 512))
+
+# report key -> JSON report; the key covers the parameters and the data's last bar
+_reports = OrderedDict()
+
+
+def report_key(symbol, short_period, long_period, initial_cash, engine, interval, df):
+    return plot_key(
+        "report",
+        symbol=symbol,
+        short_period=short_period,
+        long_period=long_period,
+        initial_cash=initial_cash,
+        engine=engine,
+        interval=interval,
+        last_date=df.index[-1],
+        bars=len(df),
+    )
+
+
+def recall_report(key):
+    report = _reports.get(key)
+    if report is not None:
+        _reports.move_to_end(key)
+    return report
+
+
+def remember_report(key, report):
+    _reports[key] = report
+    _reports.move_to_end(key)
+    while len(_reports) > REPORT_CACHE_SIZE:
+        _reports.popitem(last=False)
+
+
+def build_report(symbol, df, short_period, long_period, initial_cash, engine, interval, result):
+    """JSON performance report of a finished backtest ``result``."""
+    return {
+        "symbol": symbol,
+        "start": df.index[0].strftime('%Y-%m-%d'),
+        "end": df.index[-1].strftime('%Y-%m-%d'),
+        "parameters": {
+            "short_period": short_period,
+            "long_period": long_period,
+            "initial_cash": initial_cash,
+            "engine": engine,
+            "interval": interval,
+        },
+        "final_value": result["final_value"],
+        "total_return": result["total_return"],
+        "metrics": performance_metrics(result["equity"], result["shares"], periods_per_year=PERIODS_PER_YEAR[interval]),
+    }
+
+
+def backtest_report(symbol, df, short_period, long_period, initial_cash, engine, interval):
+    """Run the backtest and score it; also returns the equity curve for the PDF chart."""
+    if engine == "vector":
+        result = vector_backtest(df['close_price'].to_numpy(), short_period, long_period, initial_cash)
+    else:
+        result = run_backtrader(df, short_period, long_period, initial_cash)
+    report = build_report(symbol, df, short_period, long_period, initial_cash, engine, interval, result)
+    return report, result["equity"]
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+# Revalidate on every use: clients keep the body but must send If-None-Match
+CACHE_CONTROL = "no-cache"
+
+
+def response_etag(kind, symbol, df, **params):
+    """Strong ETag of a response computed from ``df``: the symbol, its latest bar and the request parameters."""
+    inputs = {"kind": kind, "symbol": symbol, "last_date": df.index[-1], "bars": len(df), **params}
+    digest = hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(request, etag):
+    """Whether the request's If-None-Match already names ``etag``."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match uses the weak comparison, so W/"x" matches "x"
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class CachedResponse:
+    __slots__ = ("etag", "body", "headers", "files")
+
+    def __init__(self, etag, body, headers, files):
+        self.etag = etag
+        self.body = body
+        self.headers = headers
+        self.files = files
+
+
+class ResponseCache:
+    """LRU of serialized JSON bodies keyed by (symbol, ETag), bounded by memory.
+
+    The ETag already changes with the symbol's latest bar; ``invalidate`` on
+    ingest just frees the superseded bodies. ``files`` are charts the body
+    links to; an entry whose chart was evicted from disk counts as a miss.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, symbol, etag):
+        key = (symbol, etag)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not all(os.path.exists(path) for path in entry.files):
+                self._discard(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, symbol, entry):
+        key = (symbol, entry.etag)
+        size = len(entry.body)
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, symbol=None):
+        with self._lock:
+            for key in [key for key in self._entries if symbol is None or key[0] == symbol]:
+                self._discard(key)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= len(entry.body)
+
+
+response_cache = ResponseCache(int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024)))
+
+
+def _respond(request, entry):
+    headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def cached_response(request, symbol, etag):
+    """304 or the stored body when this response is cached, otherwise None."""
+    entry = response_cache.get(symbol, etag)
+    return _respond(request, entry) if entry is not None else None
+
+
+def cache_response(request, symbol, etag, payload, headers=None, files=()):
+    """Serialize ``payload`` once, keep it for the next identical request and answer this one."""
+    body = JSONResponse(jsonable_encoder(payload)).body
+    entry = CachedResponse(etag, body, dict(headers or {}), tuple(files))
+    response_cache.put(symbol, entry)
+    return _respond(request, entry)
@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+from data_access import fetch_ohlcv_frame, stock_rollups, upsert_rows
+
+ROLLUP_INTERVALS = ("weekly", "monthly")
+UPDATE_COLUMNS = ["date", "open_price", "close_price", "high_price", "low_price", "volume", "bars"]
+
+
+def period_start(day, interval):
+    """Monday of the bar's week, or the first of its month."""
+    if interval == "weekly":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def rollup_frame(daily, interval):
+    """Aggregate a date-indexed daily OHLCV frame into one row per period."""
+    frame = daily.reset_index()
+    frame["period_start"] = frame["date"].dt.to_period("W-SUN" if interval == "weekly" else "M").dt.start_time
+    return frame.groupby("period_start", sort=True).agg(
+        date=("date", "max"),
+        open_price=("open_price", "first"),
+        close_price=("close_price", "last"),
+        high_price=("high_price", "max"),
+        low_price=("low_price", "min"),
+        volume=("volume", "sum"),
+        bars=("date", "size"),
+    ).reset_index()
+
+
+async def refresh_rollups(db, symbol, new_rows):
+    """Recompute only the weekly/monthly periods touched by freshly ingested bars.
+
+    Reads the daily bars from the start of the earliest affected period (the
+    new bars are already visible in the caller's transaction) and upserts the
+    aggregated rows. Runs inside the caller's transaction.
+    """
+    if not new_rows:
+        return
+    affected = {
+        interval: {period_start(row["date"], interval) for row in new_rows}
+        for interval in ROLLUP_INTERVALS
+    }
+    first = min(min(starts) for starts in affected.values())
+    daily = await fetch_ohlcv_frame(db, symbol, start=first)
+    if daily.empty:
+        return
+
+    for interval in ROLLUP_INTERVALS:
+        frame = rollup_frame(daily, interval)
+        frame = frame[frame["period_start"].dt.date.isin(list(affected[interval]))]
+        await upsert_rows(
+            db,
+            stock_rollups,
+            [
+                {
+                    "symbol": symbol,
+                    "period": interval,
+                    "period_start": row.period_start.date(),
+                    "date": row.date.date(),
+                    "open_price": row.open_price,
+                    "close_price": row.close_price,
+                    "high_price": row.high_price,
+                    "low_price": row.low_price,
+                    "volume": int(row.volume),
+                    "bars": int(row.bars),
+                }
+                for row in frame.itertuples(index=False)
+            ],
+            ["symbol", "period", "period_start"],
+            UPDATE_COLUMNS,
+        )
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from datetime import date
+from typing import List, Optional
 
 class StockDataBase(BaseModel):
     symbol: str
@@ -27,6 +28,8 @@ class PredictedStockData(BaseModel):
     symbol:str
     predicted_price: float
     actual_price:float
+    model_version: str
+    as_of_date: date
     class Config:
         orm_mode = True  # Enable ORM mode to work with SQLAlchemy models
         from_attributes = True
@@ -35,3 +38,54 @@ class PredictedStockData(BaseModel):
 # Schema for responses to clients
 class PredictedStockDataResponse(PredictedStockData):
     id: int
+
+
+MAX_PERIOD_SPAN = 2000
+MAX_SWEEP_CASH_VALUES = 100
+
+
+class PeriodRange(BaseModel):
+    start: int = Field(ge=1)
+    stop: int  # inclusive
+    step: int = Field(1, ge=1)
+
+    @model_validator(mode="after")
+    def check_span(self):
+        if not self.start <= self.stop <= self.start + MAX_PERIOD_SPAN:
+            raise ValueError(f"stop must be between start and start + {MAX_PERIOD_SPAN}")
+        return self
+
+    def values(self):
+        return range(self.start, self.stop + 1, self.step)
+
+
+class BacktestSweepRequest(BaseModel):
+    symbol: str
+    short_period: PeriodRange
+    long_period: PeriodRange
+    initial_cash: List[float] = Field(min_length=1, max_length=MAX_SWEEP_CASH_VALUES)
+    top: Optional[int] = None  # Only return the best N combinations
+
+
+class PortfolioAsset(BaseModel):
+    symbol: str
+    weight: float = 1.0
+
+
+class PortfolioBacktestRequest(BaseModel):
+    assets: List[PortfolioAsset]
+    short_period: int
+    long_period: int
+    initial_cash: float
+
+
+class PopulateBatchRequest(BaseModel):
+    symbols: List[str]
+    incremental: bool = True
+    # Each in-flight symbol holds a pooled connection while it writes
+    max_concurrency: int = Field(4, ge=1, le=8)
+
+
+class PredictBatchRequest(BaseModel):
+    symbols: Optional[List[str]] = None  # None predicts every stored symbol
+    window: int = Field(30, ge=2, le=1000)  # Number of latest closes each fit uses
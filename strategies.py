@@ -0,0 +1,40 @@
+import backtrader as bt
+
+
+class MovingAverageCrossStrategy(bt.Strategy):
+    params = (('short_period', 50), ('long_period', 200))
+
+    def __init__(self):
+        self.short_ma = bt.indicators.SimpleMovingAverage(self.data.close, period=self.params.short_period)
+        self.long_ma = bt.indicators.SimpleMovingAverage(self.data.close, period=self.params.long_period)
+        self.predicted_price = []
+
+    def next(self):
+        # Add your logic for predicting prices
+        if self.short_ma[0] > self.long_ma[0] or self.short_ma[0] < self.long_ma[0]:
+            # Append current close price to predictions
+            self.predicted_price.append(self.data.close[0])  # Now this works correctly
+
+        # Go all-in on a bullish cross and exit on a bearish one
+        if not self.position and self.short_ma[0] > self.long_ma[0]:
+            size = int(self.broker.getcash() / self.data.close[0])
+            if size > 0:
+                self.buy(size=size)
+        elif self.position and self.short_ma[0] < self.long_ma[0]:
+            self.close()
+
+
+class EquityCurve(bt.Analyzer):
+    """Records the broker value and position size at every bar."""
+
+    def start(self):
+        self.equity = []
+        self.shares = []
+
+    def next(self):
+        # Analyzers also run during the strategy's warm-up bars
+        self.equity.append(self.strategy.broker.getvalue())
+        # With cheat-on-close an order placed this bar fills at this bar's close but is only
+        # booked on the next one; count it now, as the vector engine does
+        pending = sum(order.executed.remsize for order in self.strategy.broker.orders if order.alive())
+        self.shares.append(self.strategy.position.size + pending)
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import run_backtrader, vector_backtest
+from metrics import performance_metrics
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_engines_report_the_same_metrics(seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 400)))
+    df = pd.DataFrame(
+        {"open_price": close, "high_price": close + 1, "low_price": close - 1, "close_price": close, "volume": 1000},
+        index=pd.bdate_range("2020-01-01", periods=len(close)),
+    )
+
+    cerebro = run_backtrader(df, 10, 30, 10000)
+    vector = vector_backtest(close, 10, 30, 10000)
+
+    np.testing.assert_array_equal(cerebro["shares"], vector["shares"])
+    np.testing.assert_allclose(cerebro["equity"], vector["equity"])
+    assert performance_metrics(cerebro["equity"], cerebro["shares"]) == pytest.approx(
+        performance_metrics(vector["equity"], vector["shares"])
+    )
@@ -0,0 +1,45 @@
+import asyncio
+
+import pandas as pd
+
+import ohlcv_cache
+from ohlcv_cache import OHLCVCache, load_ohlcv, reload_ohlcv
+
+
+def _frame(last_close):
+    return pd.DataFrame({"close_price": [1.0, last_close]}, index=pd.to_datetime(["2024-01-01", "2024-01-02"]))
+
+
+def test_lagging_reads_never_replace_the_reloaded_frame(monkeypatch):
+    monkeypatch.setattr(ohlcv_cache, "ohlcv_cache", OHLCVCache(1 << 20))
+    release_replica = asyncio.Event()
+
+    async def fetch(db, symbol, interval="daily"):
+        if db == "replica":
+            await release_replica.wait()
+            return _frame(1.0)  # Still without the ingested bar
+        return _frame(2.0)
+
+    monkeypatch.setattr(ohlcv_cache, "fetch_ohlcv_frame", fetch)
+
+    async def run():
+        before = asyncio.create_task(load_ohlcv("replica", "TEST"))  # Started before the ingest
+        await asyncio.sleep(0)
+        await reload_ohlcv("primary", "TEST", ["daily"])
+        after = asyncio.create_task(load_ohlcv("replica", "TEST"))  # Hits the reloaded frame
+        release_replica.set()
+        await asyncio.gather(before, after)
+        return await load_ohlcv("replica", "TEST")
+
+    assert asyncio.run(run())["close_price"].iloc[-1] == 2.0
+
+
+def test_invalidated_read_is_not_stored():
+    cache = OHLCVCache(1 << 20)
+    generation = cache.generation("TEST")
+    cache.invalidate("TEST")
+    cache.put_if_current("TEST", _frame(1.0), generation)
+    assert cache.get("TEST") is None
+
+    cache.put_if_current("TEST", _frame(1.0), cache.generation("TEST"))
+    assert cache.get("TEST") is not None
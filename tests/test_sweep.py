@@ -0,0 +1,32 @@
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+
+client = TestClient(main.app)
+
+
+def _sweep(short, long, cash=(10000.0,)):
+    return client.post("/data/backtest/sweep", json={
+        "symbol": "TEST",
+        "short_period": short,
+        "long_period": long,
+        "initial_cash": list(cash),
+    })
+
+
+def test_oversized_grid_is_rejected_before_it_is_built():
+    start = time.perf_counter()
+    response = _sweep({"start": 1, "stop": 2001}, {"start": 1, "stop": 2001})
+    assert response.status_code == 400
+    assert time.perf_counter() - start < 0.5
+
+
+def test_invalid_ranges_are_rejected():
+    assert _sweep({"start": 0, "stop": 10}, {"start": 20, "stop": 30}).status_code == 422
+    assert _sweep({"start": 5, "stop": 10, "step": 0}, {"start": 20, "stop": 30}).status_code == 422
+    assert _sweep({"start": 10, "stop": 5}, {"start": 20, "stop": 30}).status_code == 422
+    assert _sweep({"start": 1, "stop": 5000}, {"start": 20, "stop": 30}).status_code == 422
+    assert _sweep({"start": 5, "stop": 10}, {"start": 20, "stop": 30}, cash=[1.0] * 101).status_code == 422
+    assert _sweep({"start": 5, "stop": 10}, {"start": 20, "stop": 30}, cash=[]).status_code == 422
@@ -0,0 +1,44 @@
+import asyncio
+import importlib
+import logging
+import os
+import time
+
+# "off", "background" (serve immediately, import alongside) or "blocking" (import before serving)
+WARMUP_MODE = os.getenv("WARMUP_MODE", "off").lower()
+
+# Dependencies the endpoints import on first use, heaviest first
+HEAVY_MODULES = (
+    "matplotlib.figure",
+    "matplotlib.backends.backend_agg",
+    "backtrader",
+    "strategies",
+    "joblib",
+)
+
+logger = logging.getLogger(__name__)
+
+
+def import_heavy_modules(modules=HEAVY_MODULES):
+    """Import ``modules``; returns milliseconds spent on each."""
+    timings = {}
+    for name in modules:
+        start = time.perf_counter()
+        importlib.import_module(name)
+        timings[name] = (time.perf_counter() - start) * 1000
+    return timings
+
+
+async def warm_up():
+    """Load the lazily imported dependencies off the event loop.
+
+    Run it before the compute pool starts its workers and they fork with the
+    modules already loaded instead of importing them on their first job.
+    """
+    timings = await asyncio.to_thread(import_heavy_modules)
+    logger.info(
+        "Warm-up imported %s in %.0f ms",
+        ", ".join(f"{name} ({ms:.0f} ms)" for name, ms in timings.items()),
+        sum(timings.values()),
+    )
+    return timings